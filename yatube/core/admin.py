@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from .models import Job, OutboxMessage
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'state',
+        'priority',
+        'attempts',
+        'run_at',
+    )
+    list_filter = ('state', 'name')
+    readonly_fields = ('last_error',)
+
+
+admin.site.register(Job, JobAdmin)
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'created', 'attempts', 'send_after', 'failed')
+    list_filter = ('failed',)
+    readonly_fields = ('payload', 'last_error')
+
+
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
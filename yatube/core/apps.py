@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Фоновые задачи приложений регистрируются в их модулях jobs.
+        autodiscover_modules('jobs')
+        # Персональные фрагменты страниц — в модулях holes.
+        autodiscover_modules('holes')
@@ -0,0 +1,63 @@
+"""
+Загрузка пользователя запроса из кэша.
+
+Пользователь кэшируется на AUTH_USER_CACHE_TIMEOUT по id из сессии;
+хеш пароля в сессии проверяется так же, как в django.contrib.auth,
+поэтому смена пароля по-прежнему разлогинивает другие сессии. Кэш
+сбрасывается сигналами core.signals в кэше по умолчанию, поэтому
+работает только с общим для всех воркеров кэшем (memcached, redis,
+файловый). С локальным для процесса кэшем (LocMemCache) сброс не
+дошёл бы до других воркеров, и они ещё AUTH_USER_CACHE_TIMEOUT
+пускали бы по старому паролю и правам — тогда пользователь
+загружается как в django.contrib.auth, без кэша.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_users(user_ids):
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+def cache_is_shared():
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_user(request):
+    if not cache_is_shared():
+        return auth.get_user(request)
+    session = request.session
+    try:
+        user_id = auth.get_user_model()._meta.pk.to_python(
+            session[auth.SESSION_KEY]
+        )
+        backend = session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+    if backend not in settings.AUTHENTICATION_BACKENDS:
+        cache.delete(key)
+        return auth.get_user(request)
+    session_hash = session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    )):
+        session.flush()
+        return AnonymousUser()
+    user.backend = backend
+    return user
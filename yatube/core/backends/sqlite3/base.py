@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from core.slow_queries import record_slow_query
+
+
+def apply_pragmas(connection, pragmas):
+    """Выполняет PRAGMA из настроек на только что открытом соединении."""
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с журналом медленных запросов и настройкой соединений.
+
+    В OPTIONS можно передать словарь pragmas: они применяются к каждому
+    новому соединению, например journal_mode, synchronous, busy_timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if settings.SLOW_QUERY_LOG:
+            self.execute_wrappers.append(record_slow_query)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(
+            connection, self.settings_dict['OPTIONS'].get('pragmas', {})
+        )
+        return connection
@@ -0,0 +1,68 @@
+"""Общие детали нагрузочных команд для SQLite."""
+import sqlite3
+import threading
+import time
+
+from core.backends.sqlite3.base import apply_pragmas
+
+
+def connect(path, pragmas, timeout):
+    connection = sqlite3.connect(path, timeout=timeout)
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+class Worker(threading.Thread):
+    """
+    Поток, который до deadline повторяет operation(connection, number).
+
+    Если persistent=False, на каждую операцию открывается новое
+    соединение, как при CONN_MAX_AGE=0.
+    """
+
+    def __init__(self, kind, path, operation, deadline, pragmas=None,
+                 timeout=5, persistent=True):
+        super().__init__(daemon=True)
+        self.kind = kind
+        self.path = path
+        self.operation = operation
+        self.deadline = deadline
+        self.pragmas = pragmas or {}
+        self.timeout = timeout
+        self.persistent = persistent
+        self.done = 0
+        self.errors = 0
+
+    def run(self):
+        connection = None
+        if self.persistent:
+            connection = connect(self.path, self.pragmas, self.timeout)
+        while time.monotonic() < self.deadline:
+            current = connection or connect(
+                self.path, self.pragmas, self.timeout
+            )
+            try:
+                self.operation(current, self.done)
+                self.done += 1
+            except sqlite3.OperationalError:
+                self.errors += 1
+            finally:
+                if not self.persistent:
+                    current.close()
+        if connection:
+            connection.close()
+
+
+def run_workers(workers, seconds):
+    """Запускает потоки и возвращает операции в секунду по видам."""
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    result = {'errors': sum(worker.errors for worker in workers)}
+    for worker in workers:
+        result[worker.kind] = result.get(worker.kind, 0) + worker.done
+    for kind in result:
+        if kind != 'errors':
+            result[kind] /= seconds
+    return result
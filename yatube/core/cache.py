@@ -0,0 +1,46 @@
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import metrics
+
+_missing = object()
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """
+    LocMemCache, который считает попадания и промахи для метрик.
+
+    Каждый запрошенный ключ считается ровно один раз: get_many — по
+    ключу, get_or_set — по первому чтению, без повторного после add.
+    """
+
+    def _lookup(self, key, version=None):
+        value = super().get(key, _missing, version)
+        metrics.record_cache(value is not _missing)
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._lookup(key, version)
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        for key in keys:
+            value = self._lookup(key, version)
+            if value is not _missing:
+                found[key] = value
+        return found
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self._lookup(key, version)
+        if value is not _missing:
+            return value
+        if callable(default):
+            default = default()
+        if default is None:
+            return None
+        self.add(key, default, timeout=timeout, version=version)
+        # Повторное чтение — на случай, если параллельный add успел
+        # раньше; это не новое обращение, поэтому мимо счётчиков.
+        value = super().get(key, _missing, version)
+        return default if value is _missing else value
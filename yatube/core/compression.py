@@ -0,0 +1,64 @@
+"""Сжатие gzip и brotli; brotli — необязательная зависимость."""
+import gzip
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# В порядке предпочтения.
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+_accept_re = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def compress(data, encoding, level=None):
+    """Без level — максимальное сжатие, как для статики при сборке."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    # mtime=0, чтобы одинаковые данные давали одинаковые байты.
+    return gzip.compress(
+        data, compresslevel=9 if level is None else level, mtime=0
+    )
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, которые мы умеем отдавать."""
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for item in header.split(','):
+        match = _accept_re.match(item)
+        if not match:
+            continue
+        encoding, quality = match.groups()
+        try:
+            if quality is not None and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(encoding.lower())
+    return [encoding for encoding in ENCODINGS if encoding in accepted]
+
+
+_preserved_re = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL
+)
+_space_re = re.compile(r'\s+')
+
+
+def minify_html(html):
+    """
+    Схлопывает пробельные символы в HTML до одного пробела, как их
+    всё равно отображает браузер. Содержимое pre, textarea, script и
+    style не трогается.
+    """
+    parts = _preserved_re.split(html)
+    # split с двумя группами: текст, блок, имя тега, текст, ...
+    result = []
+    for index in range(0, len(parts), 3):
+        result.append(_space_re.sub(' ', parts[index]))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result).strip()
@@ -0,0 +1,8 @@
+from django.conf import settings
+
+
+def events(request):
+    """Адрес потока живых обновлений (core.events); пустой — выключено."""
+    return {
+        'sse_url': settings.SSE_URL,
+    }
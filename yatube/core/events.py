@@ -0,0 +1,205 @@
+"""
+Живые обновления страниц через server-sent events.
+
+Воркеры Django публикуют события датаграммой в Unix-сокет SSE_SOCKET
+(publish_on_commit) и не ждут ответа: если сервер событий не запущен
+или не успевает читать, событие просто теряется. Соединения браузеров
+держит отдельный процесс на asyncio — команда serve_events, — поэтому
+тысячи простаивающих потоков стоят по корутине и небольшой очереди, а
+не по синхронному воркеру. Прокси отдаёт ему адрес SSE_URL.
+
+Каждый подписчик получает свою ограниченную очередь; если клиент не
+успевает читать, новые события для него отбрасываются, а не копятся.
+"""
+import asyncio
+import json
+import os
+import re
+import socket
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+CHANNEL_RE = re.compile(r'^(index|(group|author|post):[\w-]+)$')
+MAX_REQUEST_SIZE = 8 * 1024
+
+_socket = None
+
+
+def publish(channel, event, data):
+    """Отправляет событие серверу событий, не дожидаясь его."""
+    global _socket
+    message = json.dumps(
+        {'channel': channel, 'event': event, 'data': data},
+        cls=DjangoJSONEncoder,
+    ).encode()
+    if _socket is None:
+        _socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        _socket.setblocking(False)
+    try:
+        _socket.sendto(message, settings.SSE_SOCKET)
+    except OSError:
+        # Сервер не запущен или его буфер полон.
+        pass
+
+
+def publish_on_commit(channel, event, data):
+    """Публикует событие после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: publish(channel, event, data))
+
+
+def format_event(event, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f'event: {event}\ndata: {payload}\n\n'
+
+
+def parse_channels(target):
+    """Каналы из адреса запроса или None, если адрес не подходит."""
+    url = urlsplit(target)
+    if url.path != urlsplit(settings.SSE_URL).path:
+        return None
+    channels = parse_qs(url.query).get('channel', [])
+    if (not channels or len(channels) > settings.SSE_MAX_CHANNELS
+            or not all(CHANNEL_RE.match(channel) for channel in channels)):
+        return None
+    return channels
+
+
+class EventServer(asyncio.DatagramProtocol):
+    """Подписчики по каналам и раздача им событий из сокета."""
+
+    def __init__(self):
+        self.channels = {}
+        self.transport = None
+
+    def subscribe(self, channels):
+        queue = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        for channel in channels:
+            self.channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue, channels):
+        for channel in channels:
+            subscribers = self.channels.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(queue)
+            if not subscribers:
+                del self.channels[channel]
+
+    def subscribers(self, channel):
+        return len(self.channels.get(channel, ()))
+
+    def dispatch(self, message):
+        try:
+            message = json.loads(message)
+            channel = message['channel']
+            item = (channel, message['event'], message['data'])
+        except (ValueError, KeyError, TypeError):
+            return
+        for queue in self.channels.get(channel, ()):
+            if not queue.full():
+                queue.put_nowait(item)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.dispatch(data)
+
+    async def handle(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b'\r\n\r\n'),
+                settings.SSE_HEARTBEAT_SECONDS,
+            )
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+        method, target = (head.split(b' ') + [b'', b''])[:2]
+        channels = (
+            parse_channels(target.decode('latin-1'))
+            if method == b'GET' else None
+        )
+        if channels is None:
+            writer.write(
+                b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n'
+                b'Connection: close\r\n\r\n'
+            )
+            await self.close(writer)
+            return
+        queue = self.subscribe(channels)
+        try:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/event-stream\r\n'
+                b'Cache-Control: no-cache\r\n'
+                b'X-Accel-Buffering: no\r\n'
+                b'Access-Control-Allow-Origin: *\r\n'
+                b'Connection: close\r\n\r\n'
+            )
+            await self.stream(queue, reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self.unsubscribe(queue, channels)
+            await self.close(writer)
+
+    async def stream(self, queue, reader, writer):
+        """
+        Раз в SSE_HEARTBEAT_SECONDS без событий отправляется комментарий,
+        чтобы прокси не закрывали соединение; через SSE_MAX_SECONDS поток
+        завершается, и браузер переподключается сам. Закрытие соединения
+        клиентом замечается сразу, по концу входного потока.
+        """
+        deadline = time.monotonic() + settings.SSE_MAX_SECONDS
+        writer.write(f'retry: {settings.SSE_RETRY_MS}\n\n'.encode())
+        await writer.drain()
+        disconnected = asyncio.ensure_future(reader.read())
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {getter, disconnected},
+                    timeout=min(remaining, settings.SSE_HEARTBEAT_SECONDS),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getter in done:
+                    channel, event, data = getter.result()
+                    frame = format_event(event, dict(data, channel=channel))
+                else:
+                    getter.cancel()
+                    frame = ': keepalive\n\n'
+                if disconnected in done:
+                    return
+                writer.write(frame.encode())
+                await writer.drain()
+        finally:
+            disconnected.cancel()
+
+    async def close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def start(self, host, port, socket_path):
+        """Слушает сокет событий и HTTP; возвращает HTTP-сервер."""
+        # Сокет от прошлого запуска мешает bind.
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            lambda: self, local_addr=socket_path, family=socket.AF_UNIX
+        )
+        return await asyncio.start_server(
+            self.handle, host, port, limit=MAX_REQUEST_SIZE
+        )
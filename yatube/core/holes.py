@@ -0,0 +1,147 @@
+"""
+Общий кэш страниц с «дырками» для персональных фрагментов.
+
+Страница рендерится без обращения к пользователю: вместо шапки с
+именем, кнопки подписки, формы комментария и т. п. в неё попадают
+метки <!--hole:имя:аргументы-->. Такое тело кэшируется одно на всех
+(shared_page), а HoleFillMiddleware на каждом запросе подставляет в
+метки фрагменты, зарегистрированные через register.
+
+Ключ страницы составлен из пути, разрешённых параметров запроса
+(SHARED_PAGE_PARAMS) и поколений её областей: общей и перечисленных
+в shared_page, например 'post:{post_id}'. bump_page_generation
+сбрасывает только страницы своих областей, без аргументов — все.
+"""
+import functools
+import re
+from urllib.parse import quote, unquote, urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .compression import minify_html
+
+GLOBAL_SCOPE = 'all'
+MARKER = '<!--hole:'
+# Аргументы экранируются quote, поэтому в них нет ни ':', ни '-->'.
+MARKER_RE = re.compile(r'<!--hole:([\w-]+)((?::[\w.~%-]*)*)-->')
+
+registry = {}
+
+
+def register(name):
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def marker(name, *args):
+    return mark_safe(
+        MARKER + name
+        + ''.join(f':{quote(str(arg), safe="")}' for arg in args) + '-->'
+    )
+
+
+def fill(request, content):
+    """Подставляет фрагменты текущего пользователя вместо меток."""
+    fragments = {}
+
+    def replace(match):
+        key = match.group(0)
+        if key not in fragments:
+            name = match.group(1)
+            args = [unquote(arg) for arg in match.group(2).split(':')[1:]]
+            fragment = registry[name](request, *args)
+            # Остальное тело общей страницы минифицировано заранее.
+            if settings.HTML_MINIFY:
+                fragment = minify_html(fragment)
+            fragments[key] = fragment
+        return fragments[key]
+
+    return MARKER_RE.sub(replace, content)
+
+
+def generation_key(scope):
+    # Регистр не важен: совпадение областей даёт лишь лишний сброс.
+    return f'page_generation:{scope.lower()}'
+
+
+def page_generation(scopes=()):
+    """Поколения общей области и scopes одной строкой."""
+    keys = [generation_key(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, 1, None)
+            found[key] = cache.get(key, 1)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+def bump_page_generation(*scopes):
+    """Сбрасывает страницы областей scopes, без аргументов — все."""
+    for scope in scopes or (GLOBAL_SCOPE,):
+        key = generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def page_key(request, generation):
+    # Только разрешённые параметры: иначе каждый ?utm=... — новый ключ.
+    params = urlencode([
+        (name, request.GET[name])
+        for name in settings.SHARED_PAGE_PARAMS if request.GET.get(name)
+    ])
+    return f'shared_page:{generation}:{quote(request.path)}?{params}'
+
+
+def minify(response):
+    """Минифицирует HTML один раз, до кэша (см. CompressionMiddleware)."""
+    if not (settings.HTML_MINIFY and response.get(
+        'Content-Type', ''
+    ).startswith('text/html')):
+        return
+    charset = response.charset
+    response.content = minify_html(
+        response.content.decode(charset)
+    ).encode(charset)
+    response.minified = True
+
+
+def shared_page(*scopes):
+    """
+    Кэширует ответ view на SHARED_PAGE_TIMEOUT, один для всех
+    пользователей. scopes — шаблоны областей страницы, в которые
+    подставляются аргументы view. Шаблоны таких страниц не должны
+    читать user, сессию, CSRF-токен и параметры запроса вне
+    SHARED_PAGE_PARAMS и меток hole.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            request.shared_page = True
+            generation = page_generation(
+                [scope.format(**kwargs) for scope in scopes]
+            )
+            key = page_key(request, generation)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if (response.status_code == 200 and not response.streaming
+                        and not response.cookies):
+                    minify(response)
+                    cache.set(key, response, settings.SHARED_PAGE_TIMEOUT)
+            return response
+        return wrapped
+    return decorator
+
+
+@register('user_nav')
+def user_nav(request):
+    return render_to_string('includes/user_nav.html', request=request)
@@ -0,0 +1,53 @@
+"""
+Окружение Jinja2 с аналогами тегов и фильтров шаблонов Django,
+которые используют страницы постов: url, static, thumbnail,
+addclass, date и truncatechars, а также hole для core.holes.
+"""
+import logging
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import defaultfilters
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+from sorl.thumbnail import get_thumbnail
+
+from .holes import marker
+from .templatetags.user_filters import addclass
+
+logger = logging.getLogger('yatube.templates')
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def thumbnail(image, geometry, **options):
+    """Миниатюра sorl или None, как пустой {% thumbnail %}."""
+    if not image:
+        return None
+    try:
+        return get_thumbnail(image, geometry, **options)
+    except Exception:
+        logger.exception('thumbnail %s failed', image)
+        return None
+
+
+def date(value, arg=None):
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': staticfiles_storage.url,
+        'thumbnail': thumbnail,
+        'hole': marker,
+    })
+    env.filters.update({
+        'addclass': addclass,
+        'date': date,
+        'truncatechars': defaultfilters.truncatechars,
+    })
+    return env
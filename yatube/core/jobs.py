@@ -0,0 +1,136 @@
+"""
+Очередь фоновых задач в базе данных.
+
+Задачи регистрируются декоратором register и ставятся в очередь
+функцией enqueue; выполняет их команда run_jobs. Успешные задачи
+удаляются, упавшие повторяются с растущей задержкой до max_attempts
+раз, после чего остаются в состоянии failed. Задачи с batch=True
+получают сразу список аргументов всех взятых задач с этим именем.
+"""
+import datetime
+import json
+import logging
+import traceback
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('yatube.jobs')
+
+registry = {}
+
+
+class Task:
+    def __init__(self, func, name, max_attempts, batch):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+
+def register(name=None, max_attempts=3, batch=False):
+    def decorator(func):
+        task = Task(
+            func, name or f'{func.__module__}.{func.__name__}',
+            max_attempts, batch,
+        )
+        registry[task.name] = task
+        return task
+    return decorator
+
+
+def _jobs():
+    # Очередь читается из основной базы, а не из реплики.
+    return Job.objects.db_manager(router.db_for_write(Job))
+
+
+def enqueue(task, priority=0, delay=0, **payload):
+    name = task if isinstance(task, str) else task.name
+    return _jobs().create(
+        name=name,
+        payload=json.dumps(payload, cls=DjangoJSONEncoder),
+        priority=priority,
+        run_at=timezone.now() + datetime.timedelta(seconds=delay),
+    )
+
+
+def claim(limit):
+    """Берёт в работу до limit готовых задач, старшие приоритеты первыми."""
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    _jobs().filter(state=Job.RUNNING, locked_at__lt=stale).update(
+        state=Job.PENDING, locked_at=None
+    )
+    ids = list(
+        _jobs().filter(state=Job.PENDING, run_at__lte=now)
+        .order_by('-priority', 'run_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    # Условный UPDATE не даст двум воркерам взять одну задачу.
+    claimed = []
+    for pk in ids:
+        if _jobs().filter(pk=pk, state=Job.PENDING).update(
+            state=Job.RUNNING, locked_at=now
+        ):
+            claimed.append(pk)
+    return list(_jobs().filter(pk__in=claimed).order_by('-priority', 'pk'))
+
+
+def _fail(job, task, error):
+    job.attempts += 1
+    job.last_error = error
+    job.locked_at = None
+    max_attempts = task.max_attempts if task else 1
+    if job.attempts >= max_attempts:
+        job.state = Job.FAILED
+        logger.error('job %s failed permanently:\n%s', job, error)
+    else:
+        job.state = Job.PENDING
+        job.run_at = timezone.now() + datetime.timedelta(
+            seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    job.save(update_fields=(
+        'attempts', 'last_error', 'locked_at', 'state', 'run_at',
+    ))
+
+
+def run_batch(limit=None):
+    """Выполняет одну порцию задач и возвращает их число."""
+    jobs = claim(limit or settings.JOB_BATCH_SIZE)
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job.name].append(job)
+    for name, group in groups.items():
+        task = registry.get(name)
+        if task is None:
+            for job in group:
+                _fail(job, None, f'unknown task {name}')
+            continue
+        if task.batch:
+            _run(task, group, [json.loads(job.payload) for job in group])
+        else:
+            for job in group:
+                _run(task, [job], json.loads(job.payload))
+    return len(jobs)
+
+
+def _run(task, jobs, payload):
+    try:
+        if task.batch:
+            task(payload)
+        else:
+            task(**payload)
+    except Exception:
+        error = traceback.format_exc()
+        for job in jobs:
+            _fail(job, task, error)
+    else:
+        _jobs().filter(pk__in=[job.pk for job in jobs]).delete()
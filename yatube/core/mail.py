@@ -0,0 +1,157 @@
+"""
+Исходящая почта через очередь в базе.
+
+OutboxBackend только сохраняет письма, поэтому send_mail в запросе
+не ждёт SMTP. Команда send_outbox отправляет их порциями через
+одно соединение OUTBOX_EMAIL_BACKEND, с повторами и ограничением
+скорости.
+"""
+import base64
+import datetime
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import router
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger('yatube.mail')
+
+
+def serialize(message):
+    attachments = []
+    for attachment in message.attachments:
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode(
+                message.encoding or settings.DEFAULT_CHARSET
+            )
+        attachments.append(
+            (filename, base64.b64encode(content).decode(), mimetype)
+        )
+    return json.dumps({
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'content_subtype': message.content_subtype,
+        'attachments': attachments,
+    }, ensure_ascii=False)
+
+
+def deserialize(payload, connection=None):
+    data = json.loads(payload)
+    message = EmailMultiAlternatives(
+        data['subject'], data['body'], data['from_email'], data['to'],
+        bcc=data['bcc'], connection=connection, headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        cc=data['cc'], reply_to=data['reply_to'],
+    )
+    message.content_subtype = data['content_subtype']
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+def _outbox():
+    return OutboxMessage.objects.db_manager(router.db_for_write(OutboxMessage))
+
+
+class OutboxBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        messages = [
+            OutboxMessage(payload=serialize(message))
+            for message in email_messages if message.recipients()
+        ]
+        _outbox().bulk_create(messages)
+        return len(messages)
+
+
+def claim(limit):
+    """
+    Берёт в работу до limit готовых писем.
+
+    Взятое письмо откладывается на OUTBOX_LOCK_TIMEOUT условным UPDATE,
+    как задачи в core.jobs.claim: второй процесс send_outbox его не
+    возьмёт, а если отправитель упадёт, письмо вернётся в очередь.
+    """
+    now = timezone.now()
+    rows = list(
+        _outbox().filter(failed=False, send_after__lte=now)
+        .order_by('send_after', 'pk')[:limit]
+    )
+    locked_until = now + datetime.timedelta(
+        seconds=settings.OUTBOX_LOCK_TIMEOUT
+    )
+    claimed = []
+    for row in rows:
+        if _outbox().filter(pk=row.pk, send_after=row.send_after).update(
+            send_after=locked_until
+        ):
+            row.send_after = locked_until
+            claimed.append(row)
+    return claimed
+
+
+def send_batch(limit=None):
+    """
+    Отправляет до limit готовых писем через одно соединение.
+
+    Возвращает (отправлено, с ошибкой). После ошибки отправки
+    соединение переоткрывается: SMTP-сессия могла оборваться. Если
+    соединение не открылось, исключение уходит вызывающему, а письма
+    вернутся в очередь через OUTBOX_LOCK_TIMEOUT.
+    """
+    batch = claim(limit or settings.OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0, 0
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    connection.open()
+    sent, errors = 0, 0
+    broken = False
+    interval = 1 / settings.OUTBOX_RATE_PER_SECOND
+    try:
+        for row in batch:
+            started = time.monotonic()
+            if broken:
+                connection.open()
+                broken = False
+            try:
+                deserialize(row.payload, connection).send()
+            except Exception as error:
+                errors += 1
+                _retry(row, error)
+                connection.close()
+                broken = True
+            else:
+                sent += 1
+                row.delete()
+            pause = interval - (time.monotonic() - started)
+            if pause > 0:
+                time.sleep(pause)
+    finally:
+        connection.close()
+    return sent, errors
+
+
+def _retry(row, error):
+    row.attempts += 1
+    row.last_error = repr(error)
+    if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        row.failed = True
+        logger.error('outbox message %s failed: %r', row.pk, error)
+    else:
+        row.send_after = timezone.now() + datetime.timedelta(
+            seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (row.attempts - 1)
+        )
+    row.save(update_fields=('attempts', 'last_error', 'failed', 'send_after'))
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Worker, connect, run_workers
+
+TABLES = {
+    'posts': 'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT)',
+    'comments': 'CREATE TABLE comment (id INTEGER PRIMARY KEY, '
+                'post_id INTEGER, text TEXT)',
+    'follows': 'CREATE TABLE follow (id INTEGER PRIMARY KEY, '
+               'user_id INTEGER, author_id INTEGER)',
+}
+INSERTS = {
+    'posts': ('INSERT INTO post (text) VALUES (?)', lambda n: ('text',)),
+    'comments': (
+        'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+        lambda n: (1, 'text'),
+    ),
+    'follows': (
+        'INSERT INTO follow (user_id, author_id) VALUES (?, ?)',
+        lambda n: (n, n + 1),
+    ),
+}
+
+
+def writer(kind):
+    sql, params = INSERTS[kind]
+
+    def operation(connection, number):
+        with connection:
+            connection.execute(sql, params(number))
+    return operation
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, как вынос комментариев и подписок в отдельные базы '
+        'снимает конкуренцию за блокировку записи с созданием постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post-writers', type=int, default=2)
+        parser.add_argument('--comment-writers', type=int, default=8)
+        parser.add_argument('--follow-writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        self.pragmas = database['OPTIONS'].get('pragmas', {})
+        self.timeout = database['OPTIONS'].get('timeout', 5)
+        for title, split in (('одна база', False), ('три базы', True)):
+            with tempfile.TemporaryDirectory() as directory:
+                paths = {
+                    kind: os.path.join(
+                        directory, f'{kind if split else "db"}.sqlite3'
+                    )
+                    for kind in TABLES
+                }
+                self.prepare(paths)
+                self.report(title, self.run(paths, options))
+
+    def prepare(self, paths):
+        for kind, statement in TABLES.items():
+            connection = connect(paths[kind], self.pragmas, self.timeout)
+            with connection:
+                connection.execute(statement)
+            connection.close()
+
+    def run(self, paths, options):
+        deadline = time.monotonic() + options['seconds']
+        workers = [
+            Worker(kind, paths[kind], writer(kind), deadline,
+                   pragmas=self.pragmas, timeout=self.timeout)
+            for kind, count in (
+                ('posts', options['post_writers']),
+                ('comments', options['comment_writers']),
+                ('follows', options['follow_writers']),
+            )
+            for _ in range(count)
+        ]
+        return run_workers(workers, options['seconds'])
+
+    def report(self, title, result):
+        self.stdout.write(
+            f'{title:<10} постов/с: {result["posts"]:>7.0f}  '
+            f'комментариев/с: {result["comments"]:>7.0f}  '
+            f'подписок/с: {result["follows"]:>7.0f}  '
+            f'ошибок: {result["errors"]}'
+        )
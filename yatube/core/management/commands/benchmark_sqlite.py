@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import Worker, connect, run_workers
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'pub_date REAL, text TEXT)',
+    'CREATE INDEX post_author ON post (author_id, pub_date)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT)',
+)
+
+
+def read(connection, number):
+    connection.execute(
+        'SELECT id, text FROM post WHERE author_id = ? '
+        'ORDER BY pub_date DESC LIMIT 10',
+        (number % 100,),
+    ).fetchall()
+
+
+def write(connection, number):
+    with connection:
+        connection.execute(
+            'INSERT INTO comment (post_id, text) VALUES (?, ?)',
+            (number % 1000, 'text'),
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite на чтение и запись '
+        'с настройками по умолчанию и с настройками из DATABASES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        tuned = {
+            'pragmas': database['OPTIONS'].get('pragmas', {}),
+            'timeout': database['OPTIONS'].get('timeout', 5),
+            'persistent': bool(database.get('CONN_MAX_AGE')),
+        }
+        default = {'pragmas': {}, 'timeout': 5, 'persistent': False}
+        for title, config in (('по умолчанию', default),
+                              ('настроенный', tuned)):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.prepare(path, options['rows'], config['pragmas'])
+                self.report(title, self.run(path, options, config))
+
+    def prepare(self, path, rows, pragmas):
+        connection = connect(path, pragmas, 5)
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany(
+                'INSERT INTO post (author_id, pub_date, text) '
+                'VALUES (?, ?, ?)',
+                ((number % 100, number, 'text') for number in range(rows)),
+            )
+        connection.close()
+
+    def run(self, path, options, config):
+        deadline = time.monotonic() + options['seconds']
+        workers = [
+            Worker(kind, path, operation, deadline, **config)
+            for kind, operation, count in (
+                ('reads', read, options['readers']),
+                ('writes', write, options['writers']),
+            )
+            for _ in range(count)
+        ]
+        return run_workers(workers, options['seconds'])
+
+    def report(self, title, result):
+        self.stdout.write(
+            f'{title:<14} чтений/с: {result["reads"]:>9.0f}  '
+            f'записей/с: {result["writes"]:>7.0f}  '
+            f'ошибок: {result["errors"]}'
+        )
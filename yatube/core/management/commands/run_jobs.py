@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import run_batch
+
+
+class Command(BaseCommand):
+    help = 'Воркер очереди фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.JOB_BATCH_SIZE,
+            help='Сколько задач брать за раз'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=settings.JOB_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            close_old_connections()
+            done = run_batch(options['batch_size'])
+            total += done
+            if done:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(f'Выполнено задач: {total}')
@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mail import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить готовые письма и выйти'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять через одно соединение'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_errors = 0
+        while True:
+            close_old_connections()
+            try:
+                sent, errors = send_batch(options['batch_size'])
+            except OSError as error:
+                # Почтовый сервер недоступен: письма ждут следующей попытки.
+                self.stderr.write(f'Нет соединения с сервером: {error}')
+                sent = errors = 0
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            total_sent += sent
+            total_errors += errors
+            if sent or errors:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(
+            f'Отправлено писем: {total_sent}, ошибок: {total_errors}'
+        )
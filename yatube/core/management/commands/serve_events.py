@@ -0,0 +1,32 @@
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.events import EventServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Сервер server-sent events на asyncio: принимает события от '
+        'воркеров через SSE_SOCKET и держит соединения браузеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default=settings.SSE_HOST)
+        parser.add_argument('--port', type=int, default=settings.SSE_PORT)
+        parser.add_argument('--socket', default=settings.SSE_SOCKET)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'События: {options["socket"]}, '
+            f'HTTP: {options["host"]}:{options["port"]}'
+        )
+        asyncio.run(self.serve(options))
+
+    async def serve(self, options):
+        server = await EventServer().start(
+            options['host'], options['port'], options['socket']
+        )
+        async with server:
+            await server.serve_forever()
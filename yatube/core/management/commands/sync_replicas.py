@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def copy_database(source, target):
+    """Копирует SQLite-базу через backup API, не блокируя запись надолго."""
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection, pages=1024)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную SQLite-базу в реплики из DATABASE_REPLICAS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Какие реплики обновить (по умолчанию все)'
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        source = connections['default'].settings_dict['NAME']
+        for alias in aliases:
+            if alias not in settings.DATABASES:
+                raise CommandError(f'Нет базы {alias} в DATABASES')
+            target = connections[alias].settings_dict['NAME']
+            copy_database(source, target)
+            self.stdout.write(f'{alias}: скопировано из {source}')
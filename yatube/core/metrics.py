@@ -0,0 +1,165 @@
+"""Метрики запросов по именам представлений в формате Prometheus."""
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_local = threading.local()
+
+
+class RequestStats:
+    """Счётчики одного запроса, которые копятся по ходу его обработки."""
+
+    __slots__ = (
+        'queries', 'db_time', 'template_time', 'cache_hits', 'cache_misses',
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def current():
+    """Счётчики текущего запроса или None вне запроса."""
+    return getattr(_local, 'stats', None)
+
+
+def start_request():
+    _local.stats = RequestStats()
+    return _local.stats
+
+
+def finish_request():
+    _local.stats = None
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка для connection.execute_wrapper."""
+    stats = current()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def record_cache(hit):
+    stats = current()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+class ViewMetrics:
+    __slots__ = (
+        'buckets', 'count', 'duration', 'queries', 'db_time',
+        'template_time', 'cache_hits', 'cache_misses',
+    )
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(ViewMetrics)
+
+    def observe(self, view, duration, stats):
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, duration)
+        with self._lock:
+            metrics = self._views[view]
+            metrics.buckets[bucket] += 1
+            metrics.count += 1
+            metrics.duration += duration
+            metrics.queries += stats.queries
+            metrics.db_time += stats.db_time
+            metrics.template_time += stats.template_time
+            metrics.cache_hits += stats.cache_hits
+            metrics.cache_misses += stats.cache_misses
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {
+                    name: getattr(metrics, name)
+                    if name != 'buckets' else list(metrics.buckets)
+                    for name in ViewMetrics.__slots__
+                }
+                for view, metrics in self._views.items()
+            }
+
+    def render(self):
+        """Текст в формате Prometheus exposition 0.0.4."""
+        views = sorted(self.snapshot().items())
+        lines = [
+            '# HELP yatube_request_duration_seconds Время обработки запроса.',
+            '# TYPE yatube_request_duration_seconds histogram',
+        ]
+        for view, metrics in views:
+            cumulative = 0
+            for bound, value in zip(
+                LATENCY_BUCKETS + ('+Inf',), metrics['buckets']
+            ):
+                cumulative += value
+                lines.append(
+                    'yatube_request_duration_seconds_bucket'
+                    f'{{view="{view}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'yatube_request_duration_seconds_sum{{view="{view}"}} '
+                f'{metrics["duration"]:.6f}'
+            )
+            lines.append(
+                f'yatube_request_duration_seconds_count{{view="{view}"}} '
+                f'{metrics["count"]}'
+            )
+        counters = (
+            ('yatube_db_queries_total', 'queries', 'Число SQL-запросов.'),
+            ('yatube_db_query_seconds_total', 'db_time',
+             'Суммарное время SQL-запросов.'),
+            ('yatube_template_render_seconds_total', 'template_time',
+             'Суммарное время рендеринга шаблонов.'),
+        )
+        for metric, field, description in counters:
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for view, metrics in views:
+                lines.append(f'{metric}{{view="{view}"}} {metrics[field]}')
+        lines.append('# HELP yatube_cache_requests_total Обращения к кэшу.')
+        lines.append('# TYPE yatube_cache_requests_total counter')
+        for view, metrics in views:
+            for result, field in (('hit', 'cache_hits'),
+                                  ('miss', 'cache_misses')):
+                lines.append(
+                    'yatube_cache_requests_total'
+                    f'{{view="{view}",result="{result}"}} {metrics[field]}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
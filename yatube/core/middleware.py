@@ -0,0 +1,242 @@
+import contextlib
+import mimetypes
+import os
+import posixpath
+import time
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+
+from . import auth, holes, metrics, routers, slow_queries
+from .compression import (
+    SUFFIXES, accepted_encodings, compress, minify_html,
+)
+
+
+class MetricsMiddleware:
+    """Собирает время ответа, запросы к базе и кэшу по имени view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request()
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.registry.observe(view, time.perf_counter() - start, stats)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Подписывает медленные запросы именем обрабатывающего view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            slow_queries.set_view(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slow_queries.set_view(request.resolver_match.view_name)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Закрепляет чтения за основной базой на REPLICA_STICKINESS_SECONDS
+    после того, как пользователь что-то записал.
+    """
+
+    cookie_name = 'primary_until'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        routers.start_request(
+            pinned=request.method not in self.safe_methods
+            or pinned_until > time.time()
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.finish_request()
+        if wrote:
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + settings.REPLICA_STICKINESS_SECONDS),
+                max_age=settings.REPLICA_STICKINESS_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, который берёт пользователя из кэша."""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт статику из STATIC_ROOT, собранную collectstatic с
+    CompressedManifestStaticFilesStorage: сжатый вариант по
+    Accept-Encoding и вечный кэш для файлов с хешем в имени.
+    Включается настройкой STATIC_PIPELINE.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_PIPELINE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.hashed = set(staticfiles_storage.hashed_files.values())
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            response = self.serve(
+                request, request.path_info[len(self.prefix):]
+            )
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        name = posixpath.normpath(unquote(name)).lstrip('/')
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type = mimetypes.guess_type(path)[0]
+        encoding = None
+        for candidate in accepted_encodings(request):
+            if os.path.isfile(path + SUFFIXES[candidate]):
+                encoding = candidate
+                path += SUFFIXES[candidate]
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        if name in self.hashed:
+            response['Cache-Control'] = (
+                f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+            )
+        else:
+            response['Cache-Control'] = 'public, max-age=60'
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Минифицирует HTML и сжимает ответ в gzip или brotli по
+    Accept-Encoding с уровнем из COMPRESSION_LEVELS: ответы сжимаются
+    на каждом запросе, максимальный уровень оставлен статике.
+    Общие страницы (core.holes) минифицируются один раз перед
+    кэшированием и отмечены атрибутом minified.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or response.status_code != 200):
+            return response
+        content_type = response.get('Content-Type', '')
+        is_html = content_type.startswith('text/html')
+        if not is_html and not content_type.startswith(
+            settings.COMPRESSIBLE_TYPES
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = accepted_encodings(request)
+        encoding = None
+        if encodings and len(response.content) >= (
+            settings.COMPRESSION_MIN_LENGTH
+        ):
+            encoding = encodings[0]
+        minify = (
+            is_html and settings.HTML_MINIFY
+            and not getattr(response, 'minified', False)
+        )
+        if not encoding and not minify:
+            return response
+        content = response.content
+        if minify:
+            charset = response.charset
+            content = minify_html(content.decode(charset)).encode(charset)
+        if encoding:
+            content, encoding = self.compress(content, encoding)
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+            if response.has_header('ETag'):
+                etag = response['ETag']
+                if not etag.startswith('W/'):
+                    response['ETag'] = 'W/' + etag
+        return response
+
+    def compress(self, content, encoding):
+        """(сжатые байты, encoding) или исходные, если сжатие не помогло."""
+        compressed = compress(
+            content, encoding, settings.COMPRESSION_LEVELS[encoding]
+        )
+        if len(compressed) < len(content):
+            return compressed, encoding
+        return content, None
+
+
+class HoleFillMiddleware:
+    """Заполняет метки hole в HTML-ответах фрагментами пользователя."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or not response.get(
+            'Content-Type', ''
+        ).startswith('text/html')):
+            return response
+        content = response.content.decode(response.charset)
+        if holes.MARKER not in content:
+            return response
+        response.content = holes.fill(request, content)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        return response
@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    state = models.CharField(
+        'Состояние', max_length=10, choices=STATES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_at = models.DateTimeField('Запустить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(fields=['state', '-priority', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ожидающее отправки командой send_outbox."""
+
+    payload = models.TextField('Письмо')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    failed = models.BooleanField('Не доставлено', default=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['failed', 'send_after']),
+        ]
+
+    def __str__(self):
+        return f'Письмо #{self.pk}'
@@ -0,0 +1,85 @@
+import random
+import threading
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+def start_request(pinned=False):
+    _local.pinned = pinned
+    _local.wrote = False
+
+
+def mark_write():
+    _local.pinned = True
+    _local.wrote = True
+
+
+def partition_for(model):
+    """Псевдоним базы, в которую вынесена модель, или default."""
+    return settings.DATABASE_PARTITIONS.get(model._meta.label_lower, 'default')
+
+
+def finish_request():
+    wrote = getattr(_local, 'wrote', False)
+    _local.pinned = False
+    _local.wrote = False
+    return wrote
+
+
+class PartitionRouter:
+    """
+    Отправляет модели из DATABASE_PARTITIONS в отдельные базы.
+
+    Таблицы вынесенных моделей создаются и в default (пустыми), чтобы
+    каскадное удаление из default не падало на отсутствующей таблице;
+    сами строки удаляются сигналами posts.signals.
+    """
+
+    def db_for_read(self, model, **hints):
+        return settings.DATABASE_PARTITIONS.get(model._meta.label_lower)
+
+    def db_for_write(self, model, **hints):
+        alias = settings.DATABASE_PARTITIONS.get(model._meta.label_lower)
+        if alias:
+            mark_write()
+        return alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        label = f'{app_label}.{model_name}'
+        if label in settings.DATABASE_PARTITIONS:
+            return db in ('default', settings.DATABASE_PARTITIONS[label])
+        return None
+
+
+class ReplicaRouter:
+    """
+    Чтение идёт на реплики из DATABASE_REPLICAS, запись — в default.
+
+    После первой записи в запросе все чтения этого запроса тоже идут
+    в default, чтобы пользователь увидел собственные изменения.
+    Приложения из REPLICA_EXCLUDED_APPS (сессии, пользователи) всегда
+    читаются из default: отставшая реплика иначе «разлогинивает»
+    пользователя, едва истечёт окно REPLICA_STICKINESS_SECONDS.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (not settings.DATABASE_REPLICAS
+                or getattr(_local, 'pinned', False)
+                or model._meta.app_label in settings.REPLICA_EXCLUDED_APPS):
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        mark_write()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,27 @@
+"""
+Движок сессий: кэш с базой за ним, без лишних записей.
+
+Сессия читается из кэша и только при промахе из django_session.
+Сохранение пропускается, если данные не отличаются от прочитанных,
+даже когда session.modified выставлен.
+"""
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    _loaded = None
+
+    def _dump(self, data):
+        return self.serializer().dumps(data)
+
+    def load(self):
+        data = super().load()
+        self._loaded = self._dump(data)
+        return data
+
+    def save(self, must_create=False):
+        data = self._dump(self._get_session(no_load=must_create))
+        if not must_create and self.session_key and data == self._loaded:
+            return
+        super().save(must_create=must_create)
+        self._loaded = data
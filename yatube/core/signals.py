@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import invalidate_users
+
+User = get_user_model()
+
+# При очистке связи pk_set пуст, поэтому затронутых ищем до неё.
+REVERSE_ACTIONS = ('pre_clear', 'post_add', 'post_remove')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_cached_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def reset_user_relations(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_users([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_users(instance.user_set.values_list('pk', flat=True))
+    elif action in REVERSE_ACTIONS:
+        invalidate_users(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def reset_group_members(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if not reverse:
+        if not action.startswith('post_'):
+            return
+        groups = [instance.pk]
+    elif action == 'pre_clear':
+        groups = instance.group_set.values_list('pk', flat=True)
+    elif action in REVERSE_ACTIONS:
+        groups = pk_set
+    else:
+        return
+    invalidate_users(
+        User.objects.filter(groups__in=groups)
+        .values_list('pk', flat=True).distinct()
+    )
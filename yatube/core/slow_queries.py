@@ -0,0 +1,97 @@
+"""Журнал медленных SQL-запросов с планами выполнения."""
+import logging
+import os
+import random
+import threading
+import time
+import traceback
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('yatube.slow_queries')
+
+_local = threading.local()
+recent = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+
+_project_root = os.path.abspath(settings.BASE_DIR) + os.sep
+# Служебные модули core (бэкенды, middleware) в месте вызова не нужны.
+_core_root = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_core_views = os.path.join(_core_root, 'views.py')
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def set_view(view_name):
+    _local.view = view_name
+
+
+def _origin():
+    """Ближайший к запросу кадр стека из кода проекта."""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_core_root) and filename != _core_views:
+            continue
+        if (filename.startswith(_project_root)
+                and 'site-packages' not in filename):
+            path = os.path.relpath(filename, _project_root)
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+def _explain(connection, sql, params):
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+    except Exception as error:
+        return f'plan unavailable: {error}'
+
+
+def record_slow_query(execute, sql, params, many, context):
+    """
+    Обёртка execute_wrappers: пишет в журнал запросы дольше
+    SLOW_QUERY_THRESHOLD_MS, отбирая их с вероятностью SLOW_QUERY_SAMPLE_RATE.
+    """
+    if getattr(_local, 'explaining', False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        if (duration >= settings.SLOW_QUERY_THRESHOLD_MS
+                and random.random() < settings.SLOW_QUERY_SAMPLE_RATE):
+            _local.explaining = True
+            try:
+                _store(context['connection'], sql, params, many, duration)
+            finally:
+                _local.explaining = False
+
+
+def _store(connection, sql, params, many, duration):
+    explainable = sql.lstrip().upper().startswith(EXPLAINABLE)
+    plan = ''
+    if explainable and not many:
+        plan = _explain(connection, sql, params)
+    entry = {
+        'time': timezone.now(),
+        'duration': duration,
+        'sql': sql,
+        'params': repr(params),
+        'plan': plan,
+        'view': getattr(_local, 'view', None) or '-',
+        'origin': _origin(),
+        'database': connection.alias,
+    }
+    recent.appendleft(entry)
+    logger.warning(
+        'slow query %.1f ms view=%s at %s\n%s\nparams: %s\nplan:\n%s',
+        duration, entry['view'], entry['origin'], sql, entry['params'], plan,
+    )
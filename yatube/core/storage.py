@@ -0,0 +1,42 @@
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from .compression import ENCODINGS, SUFFIXES, compress
+
+COMPRESSIBLE = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.json', '.xml', '.map',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который после collectstatic кладёт
+    рядом с каждым текстовым файлом сжатые варианты .gz и .br.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            yield name, hashed_name, processed
+            if dry_run or isinstance(processed, Exception) or not hashed_name:
+                continue
+            for path in (name, hashed_name):
+                self.compress(path)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for encoding in ENCODINGS:
+            compressed = compress(data, encoding)
+            target = path + SUFFIXES[encoding]
+            if len(compressed) >= len(data):
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            with open(target, 'wb') as output:
+                output.write(compressed)
@@ -0,0 +1,48 @@
+import time
+
+from django.template.backends import django, jinja2
+
+from . import metrics
+
+
+def _timed(render, context, request):
+    stats = metrics.current()
+    if stats is None:
+        return render(context, request)
+    start = time.perf_counter()
+    try:
+        return render(context, request)
+    finally:
+        stats.template_time += time.perf_counter() - start
+
+
+class Template(django.Template):
+    def render(self, context=None, request=None):
+        return _timed(super().render, context, request)
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """Шаблонизатор Django с учётом времени рендеринга в метриках."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Template(template.template, self)
+
+
+class Jinja2Template(jinja2.Template):
+    def render(self, context=None, request=None):
+        return _timed(super().render, context, request)
+
+
+class Jinja2(jinja2.Jinja2):
+    """Jinja2 с учётом времени рендеринга в метриках."""
+
+    def from_string(self, template_code):
+        return Jinja2Template(self.env.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return Jinja2Template(template.template, self)
@@ -0,0 +1,11 @@
+from django import template
+
+from core.holes import marker
+
+register = template.Library()
+
+
+@register.simple_tag
+def hole(name, *args):
+    """Метка персонального фрагмента для HoleFillMiddleware."""
+    return marker(name, *args)
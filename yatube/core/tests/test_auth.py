@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.auth import user_cache_key
+
+User = get_user_model()
+
+CACHE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': CACHE_DIR,
+}})
+class CachedUserTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('Dmitry', password='old-pass')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(CachedUserTest.user)
+        self.url = reverse('about:tech')
+
+    def test_user_is_loaded_once(self):
+        """Повторный запрос не обращается к auth_user."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], CachedUserTest.user)
+
+    def test_password_change_resets_cache(self):
+        """Смена пароля сбрасывает кэш и разлогинивает другие сессии."""
+        other = Client()
+        other.force_login(CachedUserTest.user)
+        other.get(self.url)
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'old-pass',
+            'new_password1': 'Zx-new-pass-42',
+            'new_password2': 'Zx-new-pass-42',
+        })
+        self.assertTrue(
+            self.client.get(self.url).context['user'].is_authenticated
+        )
+        self.assertFalse(
+            other.get(self.url).context['user'].is_authenticated
+        )
+
+    def test_permission_changes_reset_cache(self):
+        """Изменение прав и групп сбрасывает кэш пользователя."""
+        key = user_cache_key(CachedUserTest.user.pk)
+        group = Group.objects.create(name='editors')
+        permission = Permission.objects.first()
+        changes = (
+            lambda: CachedUserTest.user.user_permissions.add(permission),
+            lambda: group.user_set.add(CachedUserTest.user),
+            lambda: group.permissions.add(permission),
+            lambda: permission.group_set.clear(),
+        )
+        for change in changes:
+            self.client.get(self.url)
+            self.assertIsNotNone(cache.get(key))
+            change()
+            self.assertIsNone(cache.get(key))
+
+
+class LocalCacheUserTest(TestCase):
+    def test_local_cache_is_not_used(self):
+        """С кэшем процесса пользователь каждый раз читается из базы."""
+        user = User.objects.create_user('Dmitry')
+        client = Client()
+        client.force_login(user)
+        url = reverse('about:tech')
+        client.get(url)
+        self.assertIsNone(cache.get(user_cache_key(user.pk)))
+        # Запись мимо сигналов, как из другого воркера.
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        self.assertFalse(client.get(url).context['user'].is_authenticated)
@@ -0,0 +1,83 @@
+import gzip
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.compression import compress, minify_html
+from posts.models import Post
+
+User = get_user_model()
+
+
+class CompressionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        Post.objects.create(author=cls.user, text='Тестовый текст')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_minify_keeps_preformatted_blocks(self):
+        """Пробелы схлопываются везде, кроме pre, textarea и script."""
+        html = (
+            '<p>\n  a   b\n</p>\n<textarea>x\n\n  y</textarea>'
+            '<script>\nvar a;\n</script>'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<p> a b </p> <textarea>x\n\n  y</textarea>'
+            '<script>\nvar a;\n</script>',
+        )
+
+    def test_gzip_response(self):
+        """Страница сжимается по Accept-Encoding и минифицируется."""
+        plain = self.client.get(reverse('posts:index')).content
+        cache.clear()
+        response = self.client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertNotIn(b'\n\n', plain)
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Тестовый текст'
+        )
+
+    def test_shared_page_is_minified_once(self):
+        """Общая страница минифицируется до кэша, не на каждом запросе."""
+        self.client.force_login(CompressionTest.user)
+        with mock.patch(
+            'core.holes.minify_html', wraps=minify_html
+        ) as cached, mock.patch(
+            'core.middleware.minify_html', wraps=minify_html
+        ) as per_request:
+            bodies = [
+                gzip.decompress(self.client.get(
+                    reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+                ).content)
+                for _ in range(3)
+            ]
+        # Остальные вызовы — для небольших фрагментов в метках hole.
+        pages = [
+            call for call in cached.call_args_list if '<html' in call[0][0]
+        ]
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(per_request.call_count, 0)
+        self.assertNotIn(b'\n\n', bodies[0])
+        self.assertIn('Dmitry', bodies[2].decode())
+
+    def test_dynamic_level_is_cheaper(self):
+        """Ответы сжимаются уровнем из настроек, статика — максимальным."""
+        with mock.patch(
+            'core.middleware.compress', wraps=compress
+        ) as patched:
+            self.client.get(
+                reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+            )
+        patched.assert_called_once_with(mock.ANY, 'gzip', 5)
@@ -0,0 +1,15 @@
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLiteTuningTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        """PRAGMA из OPTIONS применяются к каждому соединению."""
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('cache_size'), -64000)
+        self.assertEqual(self.pragma('synchronous'), 1)
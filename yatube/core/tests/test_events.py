@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from core.events import EventServer, publish
+
+SOCKET_DIR = tempfile.mkdtemp()
+SOCKET = os.path.join(SOCKET_DIR, 'events.sock')
+
+
+@override_settings(SSE_HEARTBEAT_SECONDS=0.05, SSE_SOCKET=SOCKET)
+class EventsTest(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SOCKET_DIR, ignore_errors=True)
+
+    def run_server(self, client):
+        """Запускает сервер событий и корутину client(server, port)."""
+        async def main():
+            server = EventServer()
+            http = await server.start('127.0.0.1', 0, SOCKET)
+            port = http.sockets[0].getsockname()[1]
+            try:
+                return await asyncio.wait_for(client(server, port), 5)
+            finally:
+                http.close()
+                server.transport.close()
+        return asyncio.run(main())
+
+    async def request(self, port, query):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET /events/{query} HTTP/1.1\r\n\r\n'.encode())
+        status = await reader.readline()
+        await reader.readuntil(b'\r\n\r\n')
+        return status, reader, writer
+
+    def test_publish_reaches_subscriber(self):
+        """Событие из воркера доходит по сокету до подписчика канала."""
+        async def client(server, port):
+            status, reader, writer = await self.request(
+                port, '?channel=post:1'
+            )
+            self.assertIn(b' 200 ', status)
+            self.assertTrue((await reader.readline()).startswith(b'retry:'))
+            await reader.readline()
+            self.assertEqual(server.subscribers('post:1'), 1)
+            publish('post:2', 'comment', {'id': 1})
+            publish('post:1', 'comment', {'id': 2})
+            frame = await reader.readuntil(b'\n\n')
+            while frame.startswith(b':'):
+                frame = await reader.readuntil(b'\n\n')
+            event, data = frame.decode().strip().split('\n')
+            self.assertEqual(event, 'event: comment')
+            self.assertEqual(
+                json.loads(data[len('data: '):]),
+                {'id': 2, 'channel': 'post:1'},
+            )
+            writer.close()
+            await reader.read()
+            await asyncio.sleep(0.1)
+            return server.subscribers('post:1')
+
+        self.assertEqual(self.run_server(client), 0)
+
+    def test_invalid_channel(self):
+        """Неизвестные каналы отклоняются."""
+        async def client(server, port):
+            statuses = []
+            for query in ('', '?channel=secret', '?channel=post:a.b'):
+                status, _, writer = await self.request(port, query)
+                statuses.append(status)
+                writer.close()
+            return statuses
+
+        for status in self.run_server(client):
+            self.assertIn(b' 400 ', status)
+
+    def test_publish_without_server(self):
+        """Без запущенного сервера публикация молча теряется."""
+        if os.path.exists(SOCKET):
+            os.unlink(SOCKET)
+        publish('index', 'post', {'id': 1})
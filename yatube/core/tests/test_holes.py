@@ -0,0 +1,108 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import holes
+from core.holes import MARKER, fill, marker
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class HolesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('Nina')
+        cls.reader = User.objects.create_user('Oleg')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client(enforce_csrf_checks=True)
+        self.author_client.force_login(HolesTest.author)
+        self.reader_client = Client(enforce_csrf_checks=True)
+        self.reader_client.force_login(HolesTest.reader)
+
+    def test_marker_escapes_arguments(self):
+        """Аргументы меток переживают экранирование."""
+        content = str(marker('echo', 'a:b-->c@d'))
+        self.assertNotIn('-->c', content)
+
+    def test_page_body_is_shared(self):
+        """Тело страницы общее, персональные фрагменты подставляются."""
+        url = reverse('posts:post_detail', args=[HolesTest.post.pk])
+        response = self.author_client.get(url)
+        self.assertContains(response, 'Пользователь: Nina')
+        self.assertContains(response, 'редактировать запись')
+        with self.assertNumQueries(0):
+            response = Client().get(url)
+        self.assertContains(response, 'Войти')
+        self.assertNotContains(response, 'Nina</a>')
+        self.assertNotContains(response, 'Добавить комментарий')
+        response = self.reader_client.get(url)
+        self.assertContains(response, 'Пользователь: Oleg')
+        self.assertNotContains(response, 'Пользователь: Nina')
+        self.assertNotContains(response, 'редактировать запись')
+        self.assertNotContains(response, MARKER)
+
+    def test_comment_form_has_own_csrf_token(self):
+        """Форма комментария из общего кэша отправляется с CSRF."""
+        url = reverse('posts:post_detail', args=[HolesTest.post.pk])
+        self.author_client.get(url)
+        response = self.reader_client.get(url)
+        token = re.search(
+            r'name="csrfmiddlewaretoken" value="(\w+)"',
+            response.content.decode(),
+        ).group(1)
+        response = self.reader_client.post(
+            reverse('posts:add_comment', args=[HolesTest.post.pk]),
+            {'text': 'Комментарий', 'csrfmiddlewaretoken': token},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_changes_reset_shared_pages(self):
+        """Новый пост сбрасывает общий кэш страниц."""
+        url = reverse('posts:index')
+        self.reader_client.get(url)
+        Post.objects.create(author=HolesTest.author, text='Свежий пост')
+        self.assertContains(self.reader_client.get(url), 'Свежий пост')
+
+    def test_comment_resets_only_its_post(self):
+        """Комментарий сбрасывает страницу своего поста, не чужих."""
+        other = Post.objects.create(author=HolesTest.author, text='Другой')
+        url = reverse('posts:post_detail', args=[HolesTest.post.pk])
+        Client().get(url)
+        Comment.objects.create(
+            post=other, author=HolesTest.reader, text='Комментарий'
+        )
+        with self.assertNumQueries(0):
+            Client().get(url)
+        Comment.objects.create(
+            post=HolesTest.post, author=HolesTest.reader, text='Свежий'
+        )
+        self.assertContains(Client().get(url), 'Свежий')
+
+    def test_key_ignores_unknown_params(self):
+        """Лишние параметры запроса не плодят ключи кэша."""
+        url = reverse('posts:index')
+        Client().get(url + '?utm_source=a')
+        with self.assertNumQueries(0):
+            Client().get(url + '?utm_source=b')
+        keys = [key for key in cache._cache if 'shared_page:' in key]
+        self.assertEqual(len(keys), 1)
+
+    def test_fill_renders_each_marker_once(self):
+        """Одинаковые метки на странице рендерятся один раз."""
+        calls = []
+
+        def probe(request, *args):
+            calls.append(args)
+            return ''
+
+        holes.registry['probe'] = probe
+        self.addCleanup(holes.registry.pop, 'probe')
+        fill(None, f'{marker("probe", 1)}{marker("probe", 1)}')
+        self.assertEqual(calls, [('1',)])
@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from core.jobs import enqueue, register, run_batch
+from core.models import Job
+
+calls = []
+
+
+@register(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@register(name='tests.record_batch', batch=True)
+def record_batch(payloads):
+    calls.append([payload['value'] for payload in payloads])
+
+
+@register(name='tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('сломано')
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_priority_and_cleanup(self):
+        """Старшие приоритеты выполняются первыми, готовые удаляются."""
+        enqueue(record, value='low')
+        enqueue(record, priority=5, value='high')
+        enqueue(record, delay=60, value='later')
+        self.assertEqual(run_batch(), 2)
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertEqual(Job.objects.get().payload, '{"value": "later"}')
+
+    def test_batch_task(self):
+        """Пакетная задача получает аргументы всех задач разом."""
+        for value in range(3):
+            enqueue('tests.record_batch', value=value)
+        run_batch()
+        self.assertEqual(calls, [[0, 1, 2]])
+
+    def test_retries(self):
+        """Упавшая задача откладывается, затем помечается failed."""
+        job = enqueue(broken)
+        run_batch()
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.state, job.attempts), (Job.PENDING, 1)
+        )
+        self.assertIn('сломано', job.last_error)
+        Job.objects.update(run_at=job.created)
+        run_batch()
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.attempts), (Job.FAILED, 2))
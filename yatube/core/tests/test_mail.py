@@ -0,0 +1,135 @@
+import io
+import socketserver
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.mail import claim
+from core.models import OutboxMessage
+
+User = get_user_model()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и складывает их в список."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 localhost')
+        envelope = {}
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            command = line[:4].upper()
+            if not line or command == 'QUIT':
+                self.reply('221 bye')
+                return
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                envelope = {'to': []}
+                self.reply('250 ok')
+            elif command == 'RCPT':
+                address = line.split(':', 1)[1].strip().strip('<>')
+                if address in server.rejected:
+                    self.reply('550 no such user')
+                    continue
+                envelope['to'].append(address)
+                self.reply('250 ok')
+            elif command == 'DATA':
+                self.reply('354 go ahead')
+                lines = []
+                for data in iter(self.rfile.readline, b''):
+                    if data == b'.\r\n':
+                        break
+                    lines.append(data)
+                envelope['data'] = b''.join(lines)
+                server.messages.append(envelope)
+                self.reply('250 queued')
+            else:
+                self.reply('250 ok')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend',
+    OUTBOX_EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    OUTBOX_RATE_PER_SECOND=1000,
+    EMAIL_HOST='127.0.0.1',
+)
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0), SMTPHandler
+        )
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.messages = []
+        self.server.rejected = {'nobody@example.com'}
+        threading.Thread(target=self.server.serve_forever).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def send_outbox(self):
+        with self.settings(EMAIL_PORT=self.server.server_address[1]):
+            call_command(
+                'send_outbox', '--once',
+                stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+
+    def test_password_reset_goes_through_outbox(self):
+        """Письмо сброса пароля ждёт в очереди и уходит из send_outbox."""
+        User.objects.create_user('Dmitry', 'dmitry@example.com', 'pass')
+        Client().post(
+            reverse('users:password_reset'),
+            {'email': 'dmitry@example.com'},
+        )
+        self.assertEqual(self.server.messages, [])
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        self.send_outbox()
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(self.server.messages[0]['to'], ['dmitry@example.com'])
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_batch_reuses_connection_and_retries(self):
+        """Порция уходит через одно соединение, отказы повторяются."""
+        for number in range(3):
+            send_mail(
+                f'Письмо {number}', 'Текст', 'yatube@example.com',
+                [f'user{number}@example.com'],
+            )
+        send_mail('Никому', 'Текст', 'yatube@example.com',
+                  ['nobody@example.com'])
+        self.send_outbox()
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 3)
+        failed = OutboxMessage.objects.get()
+        self.assertEqual(failed.attempts, 1)
+        self.assertFalse(failed.failed)
+        self.assertGreater(failed.send_after, failed.created)
+
+    def test_connection_is_reopened_after_error(self):
+        """После отказа следующее письмо уходит через новое соединение."""
+        send_mail('Никому', 'Текст', 'yatube@example.com',
+                  ['nobody@example.com'])
+        send_mail('Письмо', 'Текст', 'yatube@example.com',
+                  ['user@example.com'])
+        self.send_outbox()
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(len(self.server.messages), 1)
+
+    def test_claimed_messages_are_not_sent_twice(self):
+        """Письмо, взятое одним send_outbox, другой не берёт."""
+        send_mail('Письмо', 'Текст', 'yatube@example.com',
+                  ['user@example.com'])
+        self.assertEqual(len(claim(10)), 1)
+        self.assertEqual(claim(10), [])
+        self.send_outbox()
+        self.assertEqual(self.server.messages, [])
+        self.assertEqual(OutboxMessage.objects.count(), 1)
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import metrics
+from core.cache import InstrumentedLocMemCache
+from core.metrics import registry
+from posts.models import Post
+
+User = get_user_model()
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        Post.objects.create(author=cls.user, text='Тестовый текст')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        registry.reset()
+
+    def test_view_metrics_are_collected(self):
+        """Метрики собираются по имени view."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        metrics = registry.snapshot()['posts:index']
+        self.assertEqual(metrics['count'], 2)
+        self.assertGreater(metrics['queries'], 0)
+        self.assertGreater(metrics['template_time'], 0)
+        self.assertGreater(metrics['cache_hits'], 0)
+
+    def test_metrics_endpoint(self):
+        """Эндпоинт отдаёт метрики в текстовом формате Prometheus."""
+        self.client.get(
+            reverse('posts:profile', args=[MetricsTest.user.username])
+        )
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        body = response.content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:profile"} 1',
+            body,
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:profile"}', body)
+
+    def test_metrics_endpoint_is_restricted(self):
+        """Эндпоинт закрыт для адресов не из METRICS_ALLOWED_IPS."""
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='192.0.2.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+
+class InstrumentedCacheTest(TestCase):
+    def setUp(self):
+        self.cache = InstrumentedLocMemCache('metrics-test', {})
+        self.cache.clear()
+        self.stats = metrics.start_request()
+        self.addCleanup(metrics.finish_request)
+
+    def test_get_many_counts_each_key(self):
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1})
+        self.assertEqual(self.stats.cache_hits, 1)
+        self.assertEqual(self.stats.cache_misses, 2)
+
+    def test_get_or_set_counts_once(self):
+        """Промах get_or_set не считается ещё и попаданием."""
+        self.assertEqual(self.cache.get_or_set('a', 1), 1)
+        self.assertEqual(self.cache.get_or_set('a', 2), 1)
+        self.assertEqual(self.stats.cache_hits, 1)
+        self.assertEqual(self.stats.cache_misses, 1)
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from core import routers
+from core.management.commands.sync_replicas import copy_database
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(TransactionTestCase):
+    # Реплика в тестах — зеркало default, поэтому без обёртки в транзакцию.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create(username='Dmitry')
+        self.post = Post.objects.create(author=self.user, text='Текст')
+        self.client = Client()
+        self.client.force_login(self.user)
+        cache.clear()
+        routers.finish_request()
+
+    def test_reads_go_to_replica_writes_to_primary(self):
+        router = routers.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_sessions_and_users_read_from_primary(self):
+        """Сессии и пользователи не читаются с отставшей реплики."""
+        router = routers.ReplicaRouter()
+        self.assertEqual(router.db_for_read(Session), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+        self.assertEqual(router.db_for_read(Post), 'replica')
+
+    def test_reads_stick_to_primary_after_write(self):
+        """После записи чтения пользователя идут в основную базу."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertNotIn('primary_until', response.cookies)
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Комментарий'},
+        )
+        self.assertIn('primary_until', response.cookies)
+        self.assertTrue(self.client.cookies['primary_until'].value)
+        with mock.patch('core.routers.random.choice') as choice:
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+        choice.assert_not_called()
+
+    def test_reads_use_replica_without_cookie(self):
+        with mock.patch(
+            'core.routers.random.choice', return_value='replica'
+        ) as choice:
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+        choice.assert_called()
+
+
+class SyncReplicasTest(TestCase):
+    def test_copy_database(self):
+        """Команда синхронизации копирует файл базы в реплику."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            connection = sqlite3.connect(source)
+            with connection:
+                connection.execute('CREATE TABLE post (text TEXT)')
+                connection.execute("INSERT INTO post VALUES ('текст')")
+            connection.close()
+
+            copy_database(source, target)
+
+            connection = sqlite3.connect(target)
+            rows = connection.execute('SELECT text FROM post').fetchall()
+            connection.close()
+        self.assertEqual(rows, [('текст',)])
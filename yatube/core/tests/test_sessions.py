@@ -0,0 +1,30 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.sessions import SessionStore
+
+
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['theme'] = 'dark'
+        session.create()
+        self.key = session.session_key
+
+    def test_unchanged_session_is_not_saved(self):
+        """Сессия без изменений не пишется ни в кэш, ни в базу."""
+        session = SessionStore(self.key)
+        session['theme'] = 'dark'
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_is_saved(self):
+        """Изменённая сессия сохраняется и читается из кэша."""
+        session = SessionStore(self.key)
+        session['theme'] = 'light'
+        session.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(self.key)['theme'], 'light')
+        cache.clear()
+        self.assertEqual(SessionStore(self.key)['theme'], 'light')
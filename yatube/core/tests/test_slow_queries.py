@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SlowQueryLogTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.staff = User.objects.create(username='admin', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый текст')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        slow_queries.recent.clear()
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_SAMPLE_RATE=1)
+    def test_slow_query_is_logged_with_plan(self):
+        """Медленный запрос попадает в журнал с планом и местом вызова."""
+        with self.assertLogs('yatube.slow_queries', 'WARNING'):
+            self.client.get(
+                reverse('posts:profile', args=[SlowQueryLogTest.user])
+            )
+        entries = [
+            entry for entry in slow_queries.recent
+            if 'posts_post' in entry['sql']
+        ]
+        self.assertTrue(entries)
+        entry = entries[0]
+        self.assertEqual(entry['view'], 'posts:profile')
+        self.assertTrue(entry['origin'].startswith('posts/'))
+        self.assertTrue(entry['plan'])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_SAMPLE_RATE=1)
+    def test_slow_queries_page_only_for_staff(self):
+        """Страница медленных запросов доступна только персоналу."""
+        with self.assertLogs('yatube.slow_queries', 'WARNING'):
+            response = self.client.get(reverse('slow_queries'))
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+            self.client.force_login(SlowQueryLogTest.staff)
+            response = self.client.get(reverse('slow_queries'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -0,0 +1,69 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, SimpleTestCase, override_settings
+
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    STATIC_PIPELINE=True,
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'collectstatic', interactive=False, verbosity=0,
+            stdout=io.StringIO(),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.url = Template(
+            "{% load static %}{% static 'css/css.css' %}"
+        ).render(Context())
+
+    def test_template_urls_are_hashed(self):
+        """{% static %} подставляет имя с хешем и рядом лежит .gz."""
+        self.assertRegex(self.url, r'^/static/css/css\.[0-9a-f]{12}\.css$')
+        name = self.url[len(settings.STATIC_URL):]
+        self.assertTrue(os.path.exists(os.path.join(STATIC_ROOT, name)))
+        self.assertTrue(
+            os.path.exists(os.path.join(STATIC_ROOT, name + '.gz'))
+        )
+
+    def test_compressed_response(self):
+        """Сжатый вариант отдаётся по Accept-Encoding с вечным кэшем."""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        response.close()
+        with open(os.path.join(settings.BASE_DIR, 'static/css/css.css'),
+                  'rb') as source:
+            self.assertEqual(body, source.read())
+
+    def test_plain_response(self):
+        """Без Accept-Encoding файл отдаётся как есть."""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response.close()
+        response = self.client.get('/static/css/css.css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        response.close()
@@ -1,12 +1,41 @@
 from django.contrib import admin
-from .models import Post, Group, Comment
+from django.contrib.auth.admin import UserAdmin
+from django.utils.html import format_html
+from django.utils.text import capfirst
+
+from .deletion import delete_group, delete_post, delete_user
+from .models import Post, Group, Comment, User
 
 
 class CommentInline(admin.TabularInline):
     model = Comment
 
 
-class PostAdmin(admin.ModelAdmin):
+class BackgroundDeleteMixin:
+    """Удаление из админки скрывает объект и дочищает его в фоне."""
+
+    delete_function = None
+
+    def delete_model(self, request, obj):
+        self.delete_function(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_function(obj)
+
+    def get_deleted_objects(self, objs, request):
+        # Каскад дочищается в фоне; полный обход связей на странице
+        # подтверждения у автора с тысячами постов слишком дорог.
+        opts = self.model._meta
+        objs = list(objs)
+        deleted = [
+            format_html('{}: {}', capfirst(opts.verbose_name), obj)
+            for obj in objs
+        ]
+        return deleted, {opts.verbose_name_plural: len(objs)}, set(), []
+
+
+class PostAdmin(BackgroundDeleteMixin, admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -18,11 +47,25 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     list_editable = ('group',)
     empty_value_display = '-пусто-'
+    delete_function = staticmethod(delete_post)
 
     inlines = [
         CommentInline,
     ]
 
 
+class GroupAdmin(BackgroundDeleteMixin, admin.ModelAdmin):
+    delete_function = staticmethod(delete_group)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(hidden=False)
+
+
+class BackgroundDeleteUserAdmin(BackgroundDeleteMixin, UserAdmin):
+    delete_function = staticmethod(delete_user)
+
+
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.unregister(User)
+admin.site.register(User, BackgroundDeleteUserAdmin)
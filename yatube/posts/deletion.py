@@ -0,0 +1,195 @@
+"""
+Удаление пользователей, постов и групп в фоне.
+
+delete_user, delete_post и delete_group сразу скрывают объект
+(отметка DeletedUser у пользователя, hidden у поста и группы; посты
+пользователя, в том числе архивные, скрываются вместе с ним, а его
+комментарии не показывает post_detail) и ставят
+задачу purge. Каждый запуск задачи удаляет не больше
+DELETION_BATCH_SIZE зависимых строк в своих коротких транзакциях и,
+если что-то осталось, ставит себя в очередь снова. Сам объект
+удаляется последним, когда каскаду уже нечего удалять. Вместе с
+постами удаляются их изображения и миниатюры.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import router
+from django.db.models import Count
+from sorl.thumbnail import delete as delete_image
+
+from core.holes import bump_page_generation
+from core.jobs import enqueue, register
+
+from .directory import post_removed
+from .feeds import bump_archive_version
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, DeletedUser, Follow,
+    FollowSuggestion, Group, Post, User,
+)
+from .profiles import invalidate_profile
+from .tags import unindex_posts
+from .timelines import invalidate_timeline
+
+
+def delete_post(post):
+    if post.hidden:
+        return
+    post.hidden = True
+    post.save(update_fields=['hidden'])
+    # Счётчики тегов и групп не видят скрытых постов.
+    unindex_posts([post.pk])
+    if post.group_id:
+        post_removed(post.group_id)
+    enqueue(purge, kind='post', pk=post.pk)
+
+
+def delete_group(group):
+    group.hidden = True
+    group.save(update_fields=['hidden'])
+    enqueue(purge, kind='group', pk=group.pk)
+
+
+def delete_user(user):
+    DeletedUser.objects.get_or_create(user=user)
+    # Войти удаляемый пользователь тоже больше не может.
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    # По одному UPDATE на таблицу; сигналы за них не сработают, поэтому
+    # счётчики тегов и групп поправляем здесь же.
+    post_ids = []
+    per_group = Counter()
+    for model in (Post, ArchivedPost):
+        visible = model.objects.filter(author_id=user.pk)
+        post_ids.extend(visible.values_list('pk', flat=True))
+        per_group.update(dict(
+            visible.exclude(group=None).order_by().values('group_id')
+            .annotate(total=Count('pk')).values_list('group_id', 'total')
+        ))
+        visible.update(hidden=True)
+    unindex_posts(post_ids)
+    for group_id, total in per_group.items():
+        post_removed(group_id, total)
+    bump_archive_version()
+    invalidate_timeline(user.pk)
+    invalidate_profile(user.pk)
+    bump_page_generation()
+    enqueue(purge, kind='user', pk=user.pk)
+
+
+@register()
+def purge(kind, pk):
+    """Шаг удаления; ставит следующий, пока зависимые строки не кончатся."""
+    budget = settings.DELETION_BATCH_SIZE
+    spent = PURGERS[kind](pk, budget)
+    if spent >= budget:
+        enqueue(purge, kind=kind, pk=pk)
+    # Скрытые посты и авторы уже сброшены со страниц, а посты удаляемой
+    # группы видны с её названием до отвязки.
+    if spent and kind == 'group':
+        bump_page_generation()
+
+
+def _ids(queryset, budget):
+    return list(queryset.values_list('pk', flat=True)[:budget])
+
+
+def _raw_delete(model, ids):
+    # Без сигналов: они сбросили бы кэш страниц на каждой строке.
+    model.objects.filter(pk__in=ids)._raw_delete(router.db_for_write(model))
+    return len(ids)
+
+
+def _delete_comments(budget, **filters):
+    return _raw_delete(
+        Comment, _ids(Comment.objects.filter(**filters), budget)
+    )
+
+
+def _delete_posts(budget, **filters):
+    spent = 0
+    for post in Post.all_objects.filter(**filters)[:budget]:
+        spent += _delete_comments(budget - spent, post_id=post.pk)
+        if spent >= budget:
+            break
+        post.delete()
+        if post.image:
+            delete_image(post.image)
+        spent += 1
+    return spent
+
+
+def _delete_archived_posts(budget, **filters):
+    spent = 0
+    for post in ArchivedPost.all_objects.filter(**filters)[:budget]:
+        spent += _raw_delete(ArchivedComment, _ids(
+            ArchivedComment.objects.filter(post_id=post.pk), budget - spent
+        ))
+        if spent >= budget:
+            break
+        post.delete()
+        if post.image:
+            delete_image(post.image)
+        spent += 1
+    return spent
+
+
+def purge_post(pk, budget):
+    return _delete_posts(budget, pk=pk)
+
+
+def purge_group(pk, budget):
+    spent = 0
+    for manager in (Post.all_objects, ArchivedPost.all_objects):
+        rows = list(manager.filter(group_id=pk).values_list(
+            'pk', 'author_id'
+        )[:budget - spent])
+        manager.filter(pk__in=[row[0] for row in rows]).update(group=None)
+        spent += len(rows)
+        # В кэше профиля лежат посты вместе с группой.
+        for author_id in {row[1] for row in rows}:
+            invalidate_profile(author_id)
+    if spent < budget:
+        Group.objects.filter(pk=pk).delete()
+    return spent
+
+
+def purge_user(pk, budget):
+    spent = 0
+    steps = (
+        # Подписки — обычным delete: сигналы сбрасывают кэш подписок.
+        lambda left: _delete_follows(left, pk),
+        lambda left: _delete_comments(left, author_id=pk),
+        lambda left: _raw_delete(ArchivedComment, _ids(
+            ArchivedComment.objects.filter(author_id=pk), left
+        )),
+        lambda left: _delete_posts(left, author_id=pk),
+        lambda left: _delete_archived_posts(left, author_id=pk),
+        lambda left: _raw_delete(FollowSuggestion, _ids(
+            FollowSuggestion.objects.filter(user_id=pk)
+            | FollowSuggestion.objects.filter(author_id=pk), left
+        )),
+    )
+    for step in steps:
+        spent += step(budget - spent)
+        if spent >= budget:
+            return spent
+    User.objects.filter(pk=pk).delete()
+    return spent
+
+
+def _delete_follows(budget, pk):
+    ids = _ids(
+        Follow.objects.filter(user_id=pk)
+        | Follow.objects.filter(author_id=pk),
+        budget,
+    )
+    Follow.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+PURGERS = {
+    'post': purge_post,
+    'group': purge_group,
+    'user': purge_user,
+}
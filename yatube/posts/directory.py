@@ -0,0 +1,48 @@
+"""
+Счётчики каталога групп.
+
+Group.post_count — число постов группы вместе с архивом, поэтому
+archive_posts его не меняет. Group.last_post_at — дата последнего
+поста. Сигналы обновляют оба поля одним UPDATE на изменение; полный
+пересчёт делает команда recount_groups. Скрытые до удаления посты
+(posts.deletion) вычитаются сразу при скрытии и больше не считаются.
+"""
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import ArchivedPost, Group, Post
+
+
+def post_added(group_id, pub_date):
+    Group.objects.filter(pk=group_id).update(
+        post_count=F('post_count') + 1,
+        last_post_at=Greatest(Coalesce('last_post_at', pub_date), pub_date),
+    )
+
+
+def post_removed(group_id, count=1):
+    Group.objects.filter(pk=group_id).update(
+        post_count=F('post_count') - count,
+        last_post_at=last_post_at(group_id),
+    )
+
+
+def last_post_at(group_id):
+    # Архивные посты старше горячих, в архив смотрим только без них.
+    for model in (Post, ArchivedPost):
+        latest = model.objects.filter(group_id=group_id).aggregate(
+            latest=Max('pub_date')
+        )['latest']
+        if latest is not None:
+            return latest
+    return None
+
+
+def recount(groups):
+    for group in groups:
+        group.post_count = (
+            Post.objects.filter(group_id=group.pk).count()
+            + ArchivedPost.objects.filter(group_id=group.pk).count()
+        )
+        group.last_post_at = last_post_at(group.pk)
+        group.save(update_fields=['post_count', 'last_post_at'])
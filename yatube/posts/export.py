@@ -0,0 +1,201 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.routers import partition_for
+
+from .models import ArchivedComment, ArchivedPost, Comment, Group, Post, User
+
+EXPORT_CHUNK_SIZE = 2000
+
+FORMATS = ('jsonl', 'csv')
+
+POST_FIELDS = (
+    'id', 'pub_date', 'author_id', 'author__username', 'group_id',
+    'group__slug', 'text', 'image',
+)
+# Архив и комментарии могут жить в другой базе, поэтому без JOIN
+# с авторами и группами.
+ARCHIVED_POST_FIELDS = (
+    'id', 'pub_date', 'author_id', 'group_id', 'text', 'image',
+)
+COMMENT_FIELDS = ('id', 'created', 'post_id', 'author_id', 'text')
+
+
+def parse_date_filter(value):
+    """Дата ГГГГ-ММ-ДД или None для пустого значения; иначе ValueError."""
+    if not value:
+        return None
+    # parse_date возвращает None на мусор и бросает ValueError на
+    # несуществующие даты вроде 2024-02-30.
+    date = parse_date(value)
+    if date is None:
+        raise ValueError(f'Неверная дата: {value}')
+    return date
+
+
+def start_of_day(date):
+    """Полночь даты в текущем часовом поясе."""
+    return timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time.min)
+    )
+
+
+def filter_dates(posts, since=None, until=None):
+    """Посты со дня since по день until включительно."""
+    if since:
+        posts = posts.filter(pub_date__gte=start_of_day(since))
+    if until:
+        posts = posts.filter(
+            pub_date__lt=start_of_day(until + datetime.timedelta(days=1))
+        )
+    return posts
+
+
+def filter_posts(since=None, until=None, group=None, author=None):
+    """Посты с учётом фильтров по дате, группе и автору."""
+    posts = filter_dates(Post.objects.order_by('pk'), since, until)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    return posts
+
+
+def filter_archived_posts(since=None, until=None, group=None, author=None):
+    """Архивные посты с теми же фильтрами; группа и автор — по id."""
+    posts = filter_dates(ArchivedPost.objects.order_by('pk'), since, until)
+    if group:
+        posts = posts.filter(group_id__in=list(
+            Group.objects.filter(slug=group).values_list('pk', flat=True)
+        ))
+    if author:
+        posts = posts.filter(author_id__in=list(
+            User.objects.filter(username=author).values_list('pk', flat=True)
+        ))
+    return posts
+
+
+def iter_archived_post_rows(posts):
+    """Строки архивных постов с именами авторов и slug групп."""
+    rows = posts.values_list(*ARCHIVED_POST_FIELDS).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    while True:
+        chunk = list(itertools.islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        records = [dict(zip(ARCHIVED_POST_FIELDS, row)) for row in chunk]
+        usernames = dict(User.objects.filter(
+            pk__in={record['author_id'] for record in records}
+        ).values_list('pk', 'username'))
+        slugs = dict(Group.objects.filter(
+            pk__in={record['group_id'] for record in records}
+        ).values_list('pk', 'slug'))
+        for record in records:
+            record['author__username'] = usernames.get(record['author_id'])
+            record['group__slug'] = slugs.get(record['group_id'])
+            yield record
+
+
+def iter_comment_rows(model, posts, filtered):
+    """
+    Комментарии model к отфильтрованным постам.
+
+    Если комментарии вынесены в другую базу, подзапрос невозможен,
+    и id постов передаются порциями.
+    """
+    comments = model.objects.order_by('pk')
+    if not filtered:
+        yield from comments.values_list(*COMMENT_FIELDS).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+    elif partition_for(model) == partition_for(posts.model):
+        yield from comments.filter(
+            post__in=posts.values('pk')
+        ).values_list(*COMMENT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    else:
+        post_ids = posts.values_list('pk', flat=True).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE
+        )
+        while True:
+            chunk = list(itertools.islice(post_ids, EXPORT_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield from comments.filter(
+                post_id__in=chunk
+            ).values_list(*COMMENT_FIELDS)
+
+
+def iter_records(since=None, until=None, group=None, author=None):
+    """
+    Отдаёт записи экспорта по одной: сначала посты, горячие и из
+    архива, затем их комментарии.
+
+    Строки читаются серверным курсором порциями по EXPORT_CHUNK_SIZE,
+    поэтому память не зависит от размера таблиц.
+    """
+    posts = filter_posts(since, until, group, author)
+    archived = filter_archived_posts(since, until, group, author)
+    for row in posts.values_list(*POST_FIELDS).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        record = dict(zip(POST_FIELDS, row))
+        record['type'] = 'post'
+        yield record
+    for record in iter_archived_post_rows(archived):
+        record['type'] = 'post'
+        yield record
+    filtered = any((since, until, group, author))
+    comments = itertools.chain(
+        iter_comment_rows(Comment, posts, filtered),
+        iter_comment_rows(ArchivedComment, archived, filtered),
+    )
+    for row in comments:
+        record = dict(zip(COMMENT_FIELDS, row))
+        record['type'] = 'comment'
+        yield record
+
+
+def _clean(record):
+    return {
+        key.replace('__', '_'): (
+            value.isoformat() if hasattr(value, 'isoformat') else value
+        )
+        for key, value in record.items()
+    }
+
+
+def iter_jsonl(records):
+    for record in records:
+        yield json.dumps(_clean(record), ensure_ascii=False) + '\n'
+
+
+CSV_COLUMNS = (
+    'type', 'id', 'pub_date', 'created', 'post_id', 'author_id',
+    'author_username', 'group_id', 'group_slug', 'text', 'image',
+)
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(_clean(record))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_export(export_format, **filters):
+    """Строки экспорта в формате jsonl или csv."""
+    records = iter_records(**filters)
+    if export_format == 'csv':
+        return iter_csv(records)
+    return iter_jsonl(records)
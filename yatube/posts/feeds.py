@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+
+ARCHIVE_VERSION_KEY = 'archive_version'
+
+
+def archive_version():
+    """Номер поколения архива; растёт после каждого запуска archive_posts."""
+    return cache.get_or_set(ARCHIVE_VERSION_KEY, 1, None)
+
+
+def bump_archive_version():
+    try:
+        cache.incr(ARCHIVE_VERSION_KEY)
+    except ValueError:
+        cache.set(ARCHIVE_VERSION_KEY, 2, None)
+
+
+class ChainedFeed:
+    """
+    Лента из горячих постов, которая продолжается в архив.
+
+    Оба набора отсортированы по убыванию pub_date, и все архивные посты
+    старше горячих, поэтому страницу можно собрать простым сдвигом.
+    Объект понимает count() и срезы — этого достаточно для Paginator.
+    Число архивных постов меняется только при архивации и кэшируется
+    по ключу cache_key.
+    """
+
+    def __init__(self, hot, archive, cache_key=None):
+        self.hot = hot
+        self.archive = archive
+        self.cache_key = cache_key
+        self._hot_count = None
+
+    @property
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def archive_count(self):
+        if self.cache_key is None:
+            return self.archive.count()
+        key = f'archive_count:{archive_version()}:{self.cache_key}'
+        total = cache.get(key)
+        if total is None:
+            total = self.archive.count()
+            cache.set(key, total, settings.ARCHIVE_COUNT_TIMEOUT)
+        return total
+
+    def count(self):
+        return self.hot_count + self.archive_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        hot_count = self.hot_count
+        items = []
+        if start < hot_count:
+            items.extend(self.hot[start:min(stop, hot_count)])
+        if stop > hot_count:
+            items.extend(self.archive[
+                max(start - hot_count, 0):stop - hot_count
+            ])
+        return items
@@ -0,0 +1,62 @@
+"""
+Состояние подписок зрителя.
+
+Множество id авторов, на которых подписан пользователь, читается
+одним запросом и кэшируется; ответ «подписан ли зритель на X» для
+любого числа авторов больше не требует запросов к базе.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+
+def followed_key(user_id):
+    return f'followed:{user_id}'
+
+
+def invalidate_followed(user_id):
+    cache.delete(followed_key(user_id))
+
+
+def followed_ids(user_id):
+    key = followed_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user_id=user_id).values_list(
+                'author_id', flat=True
+            )
+        )
+        cache.set(key, ids, settings.FOLLOWED_IDS_TIMEOUT)
+    return ids
+
+
+class FollowState:
+    """Подписки пользователя; множество загружается при первом обращении."""
+
+    def __init__(self, user):
+        self.user = user
+        self._ids = None
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            if self.user.is_authenticated:
+                self._ids = followed_ids(self.user.pk)
+            else:
+                self._ids = frozenset()
+        return self._ids
+
+    def __contains__(self, author):
+        return getattr(author, 'pk', author) in self.ids
+
+    def __iter__(self):
+        return iter(self.ids)
+
+
+def follow_state(request):
+    """Один FollowState на запрос."""
+    if not hasattr(request, '_follow_state'):
+        request._follow_state = FollowState(request.user)
+    return request._follow_state
@@ -0,0 +1,65 @@
+"""Персональные и часто меняющиеся фрагменты страниц постов для core.holes."""
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import format_html
+
+from core.holes import register
+
+from .follows import follow_state
+from .forms import CommentForm
+from .profiles import get_profile
+from .views import follow_suggestions
+
+
+@register('switcher')
+def switcher(request):
+    return render_to_string(
+        'posts/includes/switcher.html', request=request
+    )
+
+
+@register('follow_button')
+def follow_button(request, author_id, username):
+    context = {
+        'username': username,
+        'following': int(author_id) in follow_state(request),
+    }
+    return render_to_string(
+        'posts/includes/follow_button.html', context, request=request
+    )
+
+
+@register('suggestions')
+def suggestions(request, author_id):
+    if not request.user.is_authenticated:
+        return ''
+    exclude = [*follow_state(request), int(author_id)]
+    context = {'suggestions': follow_suggestions(request.user, exclude)}
+    return render_to_string(
+        'posts/includes/suggestions.html', context, request=request
+    )
+
+
+@register('comment_form')
+def comment_form(request, post_id):
+    context = {'post_id': post_id, 'form': CommentForm()}
+    return render_to_string(
+        'posts/includes/comment_form.html', context, request=request
+    )
+
+
+@register('edit_link')
+def edit_link(request, post_id, author_id):
+    if request.user.pk != int(author_id):
+        return ''
+    return format_html(
+        '<a class="btn btn-primary" href="{}">редактировать запись</a>',
+        reverse('posts:post_edit', args=[post_id]),
+    )
+
+
+@register('author_post_count')
+def author_post_count(request, username):
+    # Страница поста кэшируется по области post:<id>, а число постов
+    # автора меняется с каждым его постом; берём его из кэша профиля.
+    return str(get_profile(username)[0].post_count)
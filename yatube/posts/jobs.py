@@ -0,0 +1,21 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.jobs import register
+
+# purge регистрируется при импорте, run_jobs должен его видеть.
+from .deletion import purge  # noqa: F401
+from .models import Post
+
+# Миниатюры, которые используют шаблоны постов.
+THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+
+@register(batch=True)
+def warm_thumbnails(payloads):
+    """Заранее строит миниатюры, чтобы первый просмотр их не ждал."""
+    ids = [payload['post_id'] for payload in payloads]
+    for post in Post.objects.filter(pk__in=ids).exclude(image=''):
+        for geometry, options in THUMBNAILS:
+            get_thumbnail(post.image, geometry, **options)
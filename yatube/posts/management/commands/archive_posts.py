@@ -0,0 +1,87 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import router, transaction
+from django.utils import timezone
+
+from core.holes import bump_page_generation
+from posts.feeds import bump_archive_version
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+from posts.profiles import invalidate_profile
+from posts.timelines import invalidate_timeline
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше ARCHIVE_AFTER_DAYS вместе с комментариями '
+        'в архивные таблицы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        total = 0
+        while True:
+            moved = self.archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'Перенесено постов: {total}')
+        if total:
+            bump_archive_version()
+            bump_page_generation()
+        self.stdout.write(self.style.SUCCESS(f'Готово, постов: {total}'))
+
+    def archive_batch(self, cutoff, batch_size):
+        """
+        Копирует порцию постов в архив и удаляет их из горячих таблиц.
+
+        Сначала пишется архив, затем удаляются оригиналы: если команда
+        упадёт посередине, повторный запуск просто продолжит работу.
+        """
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff)
+            .order_by('pub_date')
+            .values(*POST_FIELDS)[:batch_size]
+        )
+        if not posts:
+            return 0
+        post_ids = [post['id'] for post in posts]
+        comments = list(
+            Comment.objects.filter(post_id__in=post_ids).values(
+                *COMMENT_FIELDS
+            )
+        )
+        with transaction.atomic(using=router.db_for_write(ArchivedPost)):
+            ArchivedPost.objects.bulk_create(
+                (ArchivedPost(**post) for post in posts),
+                ignore_conflicts=True,
+            )
+            ArchivedComment.objects.bulk_create(
+                (ArchivedComment(**comment) for comment in comments),
+                ignore_conflicts=True,
+            )
+        # Архивация — не удаление: без сигналов и каскада, которые
+        # уменьшили бы счётчики и удалили уже перенесённые комментарии.
+        with transaction.atomic(using=router.db_for_write(Comment)):
+            Comment.objects.filter(post_id__in=post_ids)._raw_delete(
+                router.db_for_write(Comment)
+            )
+        # Строки индекса тегов остаются: id поста в архиве тот же.
+        with transaction.atomic(using=router.db_for_write(Post)):
+            Post.objects.filter(pk__in=post_ids)._raw_delete(
+                router.db_for_write(Post)
+            )
+        for author_id in {post['author_id'] for post in posts}:
+            invalidate_timeline(author_id)
+            invalidate_profile(author_id)
+        return len(posts)
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность follow_index для '
+        'авторизованного пользователя с разными хранилищами сессий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--stores', nargs='*', default=list(settings.SESSION_ENGINES),
+            help='Какие хранилища из SESSION_ENGINES сравнить'
+        )
+
+    def handle(self, *args, **options):
+        viewer_id = Follow.objects.values_list('user_id', flat=True).first()
+        viewer = User.objects.filter(pk=viewer_id).first()
+        if viewer is None:
+            raise CommandError(
+                'В базе нет подписок, сначала выполните generate_data.'
+            )
+        self.stdout.write(
+            f'{"store":<16}{"req/s":>10}{"queries":>9}{"session":>9}'
+        )
+        for store in options['stores']:
+            with override_settings(
+                SESSION_ENGINE=settings.SESSION_ENGINES[store]
+            ):
+                cache.clear()
+                queries, session_queries = self.queries(viewer)
+                rate = self.throughput(viewer, options)
+            self.stdout.write(
+                f'{store:<16}{rate:>10.1f}{queries:>9}{session_queries:>9}'
+            )
+
+    def client(self, viewer):
+        # Адрес вне INTERNAL_IPS, чтобы не включался debug_toolbar.
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR='192.0.2.1')
+        client.force_login(viewer)
+        return client
+
+    def queries(self, viewer):
+        """Запросы одного прогретого обращения: всего и к django_session."""
+        client = self.client(viewer)
+        url = reverse('posts:follow_index')
+        client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        session_queries = sum(
+            'django_session' in query['sql'] for query in captured
+        )
+        return len(captured), session_queries
+
+    def throughput(self, viewer, options):
+        url = reverse('posts:follow_index')
+        deadline = time.monotonic() + options['seconds']
+        done = []
+
+        def work():
+            client = self.client(viewer)
+            count = 0
+            try:
+                while time.monotonic() < deadline:
+                    if client.get(url).status_code != 200:
+                        raise CommandError('follow_index вернул ошибку')
+                    count += 1
+            finally:
+                done.append(count)
+                close_old_connections()
+
+        threads = [
+            threading.Thread(target=work) for _ in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(done) / options['seconds']
@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.metrics import registry
+
+from .benchmark_views import Command as ViewsBenchmark, percentile
+
+PAGES = ('index', 'group_list', 'profile', 'post_detail', 'follow_index')
+ENGINES = [template['NAME'] for template in settings.TEMPLATES]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа и рендеринга страниц posts '
+        'на шаблонизаторах Django и Jinja2.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--only', nargs='*', choices=PAGES)
+
+    def handle(self, *args, **options):
+        views = ViewsBenchmark()
+        fixtures = views.fixtures()
+        specs = views.requests(*fixtures)
+        # Адрес вне INTERNAL_IPS, чтобы не включался debug_toolbar.
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR='192.0.2.1')
+        client.force_login(fixtures[0])
+        self.stdout.write(
+            f'{"view":<14}{"engine":<8}{"p50, ms":>10}{"template, ms":>14}'
+        )
+        for name in options['only'] or PAGES:
+            url = specs[name][1]
+            for engine in ENGINES:
+                with override_settings(POSTS_TEMPLATE_ENGINE=engine):
+                    total, template = self.measure(
+                        client, url, options['requests']
+                    )
+                self.stdout.write(
+                    f'{name:<14}{engine:<8}{total:>10.1f}{template:>14.1f}'
+                )
+
+    def measure(self, client, url, count):
+        registry.reset()
+        timings = []
+        for _ in range(count):
+            # Без кэша страница index не рендерилась бы заново.
+            cache.clear()
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{url}: код {response.status_code}')
+        metrics = next(iter(registry.snapshot().values()))
+        return (
+            percentile(timings, 0.5),
+            metrics['template_time'] / metrics['count'] * 1000,
+        )
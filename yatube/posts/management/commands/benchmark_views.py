@@ -0,0 +1,217 @@
+import json
+import time
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post, Tag, User
+
+# Маршруты, которые не имеет смысла гонять в цикле.
+SKIPPED = {'export'}
+
+
+class QueryCounter:
+    """Считает запросы ко всем базам, не открывая лишних соединений."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все адреса posts/urls.py через тестовый клиент и '
+        'выводит p50/p95/p99 и число запросов к базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--page', type=int, default=1)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом'
+        )
+        parser.add_argument('--only', nargs='*', help='Имена маршрутов')
+        parser.add_argument('--baseline', help='JSON с прошлыми результатами')
+        parser.add_argument(
+            '--save-baseline', help='Куда сохранить результаты в JSON'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимое ухудшение p95 относительно baseline'
+        )
+
+    def handle(self, *args, **options):
+        results = self.run(options)
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline:
+                json.dump(results, baseline, indent=2, sort_keys=True)
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def fixtures(self):
+        """Подбирает самые «тяжёлые» объекты для каждого маршрута."""
+        # Подписки и комментарии могут жить в других базах,
+        # поэтому агрегаты считаются без JOIN с их таблицами.
+        viewer_id = Follow.objects.values('user_id').annotate(
+            total=Count('id')
+        ).order_by('-total').values_list('user_id', flat=True).first()
+        viewer = User.objects.filter(pk=viewer_id).first()
+        author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        group = Group.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        post_id = Comment.objects.values('post_id').annotate(
+            total=Count('id')
+        ).order_by('-total').values_list('post_id', flat=True).first()
+        post = Post.objects.filter(pk=post_id).first()
+        tag = Tag.objects.order_by('-post_count').first()
+        if not all((viewer, author, group, post, tag)):
+            raise CommandError(
+                'В базе нет данных, сначала выполните generate_data.'
+            )
+        if post.author != viewer:
+            post = Post.objects.filter(author=viewer).first() or post
+        return viewer, author, group, post, tag
+
+    def requests(self, viewer, author, group, post, tag):
+        """Имя маршрута -> (метод, адрес, данные)."""
+        return {
+            'index': ('get', reverse('posts:index'), None),
+            'group_index': ('get', reverse('posts:group_index'), None),
+            'trending': ('get', reverse('posts:trending'), None),
+            'group_list': (
+                'get', reverse('posts:group_list', args=[group.slug]), None
+            ),
+            'tag_list': (
+                'get', reverse('posts:tag_list', args=[tag.name]), None
+            ),
+            'profile': (
+                'get', reverse('posts:profile', args=[author.username]), None
+            ),
+            'post_detail': (
+                'get', reverse('posts:post_detail', args=[post.pk]), None
+            ),
+            'post_create': ('get', reverse('posts:post_create'), None),
+            'post_edit': (
+                'get', reverse('posts:post_edit', args=[post.pk]), None
+            ),
+            'add_comment': (
+                'post', reverse('posts:add_comment', args=[post.pk]),
+                {'text': 'Комментарий из бенчмарка'},
+            ),
+            'follow_index': ('get', reverse('posts:follow_index'), None),
+            'profile_follow': (
+                'get',
+                reverse('posts:profile_follow', args=[author.username]),
+                None,
+            ),
+            'profile_unfollow': (
+                'get',
+                reverse('posts:profile_unfollow', args=[author.username]),
+                None,
+            ),
+        }
+
+    def run(self, options):
+        viewer, author, group, post, tag = self.fixtures()
+        # Адрес вне INTERNAL_IPS, чтобы не включался debug_toolbar.
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR='192.0.2.1')
+        client.force_login(viewer)
+        specs = self.requests(viewer, author, group, post, tag)
+        page = options['page']
+        results = {}
+        for pattern in posts_urls.urlpatterns:
+            name = pattern.name
+            if options['only'] and name not in options['only']:
+                continue
+            if name in SKIPPED:
+                continue
+            if name not in specs:
+                self.stderr.write(f'Нет сценария для маршрута {name}')
+                continue
+            method, url, data = specs[name]
+            if method == 'get' and page > 1:
+                url = f'{url}?page={page}'
+            results[name] = self.measure(
+                client, method, url, data, options['requests'],
+                options['cold'],
+            )
+        return results
+
+    def measure(self, client, method, url, data, count, cold):
+        timings = []
+        queries = []
+        for _ in range(count):
+            if cold:
+                cache.clear()
+            # Запросы к репликам и вынесенным базам тоже считаются.
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for db in connections.all():
+                    stack.enter_context(db.execute_wrapper(counter))
+                start = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f'{url}: код {response.status_code}')
+            queries.append(counter.count)
+        return {
+            'url': url,
+            'p50': percentile(timings, 0.50),
+            'p95': percentile(timings, 0.95),
+            'p99': percentile(timings, 0.99),
+            'queries': max(queries),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"view":<18}{"p50, ms":>10}{"p95, ms":>10}'
+            f'{"p99, ms":>10}{"queries":>9}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<18}{result["p50"]:>10.1f}{result["p95"]:>10.1f}'
+                f'{result["p99"]:>10.1f}{result["queries"]:>9}'
+            )
+
+    def compare(self, results, path, tolerance):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = []
+        for name, result in results.items():
+            old = baseline.get(name)
+            if old is None:
+                continue
+            if result['p95'] > old['p95'] * (1 + tolerance):
+                regressions.append(
+                    f'{name}: p95 {old["p95"]:.1f} -> {result["p95"]:.1f} мс'
+                )
+            if result['queries'] > old['queries']:
+                regressions.append(
+                    f'{name}: запросов {old["queries"]} -> '
+                    f'{result["queries"]}'
+                )
+        for line in regressions:
+            self.stderr.write(line)
+        if regressions:
+            raise CommandError('Есть регрессии относительно baseline.')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
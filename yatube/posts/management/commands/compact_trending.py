@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.holes import bump_page_generation
+from posts.trending import compact
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает топ популярных постов и групп из интервалов '
+        'активности и удаляет интервалы старше окна. Запускать '
+        'периодически, например раз в TRENDING_BUCKET_SECONDS.'
+    )
+
+    def handle(self, *args, **options):
+        total = compact()
+        bump_page_generation('trending')
+        self.stdout.write(self.style.SUCCESS(f'Готово, строк топа: {total}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, iter_export, parse_date_filter
+
+
+def date_arg(value):
+    try:
+        return parse_date_filter(value)
+    except ValueError as error:
+        raise CommandError(error)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты и комментарии вместе с архивом в формате '
+        'JSONL или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output', help='Файл для записи (по умолчанию stdout)'
+        )
+        parser.add_argument('--since', type=date_arg)
+        parser.add_argument('--until', type=date_arg)
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--author', help='username автора')
+
+    def handle(self, *args, **options):
+        lines = iter_export(
+            options['format'],
+            since=options['since'],
+            until=options['until'],
+            group=options['group'],
+            author=options['author'],
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
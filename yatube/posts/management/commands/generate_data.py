@@ -0,0 +1,245 @@
+import contextlib
+import datetime
+import itertools
+import os
+import random
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+from PIL import Image
+
+from posts import directory, tags
+from posts.models import Comment, Follow, Group, Post, User
+
+BATCH_SIZE = 5000
+IMAGE_DIR = 'posts/synthetic'
+WORDS = (
+    'яндекс практикум пост лента группа автор подписка комментарий '
+    'город лето зима кофе код python django тест книга кино музыка '
+    'погода работа отпуск фото дом кот собака утро вечер новости'
+).split()
+
+
+@contextlib.contextmanager
+def manual_dates():
+    """Позволяет записать свои значения в поля с auto_now_add."""
+    fields = [
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'),
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def power_law_weights(count, alpha):
+    """Кумулятивные веса распределения Ципфа для count элементов."""
+    return list(itertools.accumulate(
+        1 / (rank ** alpha) for rank in range(1, count + 1)
+    ))
+
+
+def next_index(queryset, field, prefix):
+    """
+    Номер после наибольшего prefix<N> в field: count() после удалений
+    дал бы уже занятый номер.
+    """
+    last = queryset.filter(
+        **{f'{field}__regex': rf'^{prefix}(0|[1-9][0-9]*)$'}
+    ).annotate(length=Length(field)).order_by(
+        '-length', f'-{field}'
+    ).values_list(field, flat=True).first()
+    return int(last[len(prefix):]) + 1 if last else 0
+
+
+def random_text(rng, min_words=5, max_words=60):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(min_words, max_words)))
+
+
+def random_post_text(rng, tag_share=0.3):
+    text = random_text(rng)
+    if rng.random() < tag_share:
+        text += f' #{rng.choice(WORDS)}'
+    return text
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими пользователями, постами, подписками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--follows', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument(
+            '--images', type=float, default=0.1,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного распределения популярности'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить даты публикаций'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.span = datetime.timedelta(days=options['days'])
+        with manual_dates():
+            users = self.create_users(options['users'])
+            groups = self.create_groups(options['groups'])
+            images = self.create_images(8)
+            posts = self.create_posts(
+                options['posts'], users, groups, images,
+                options['images'], options['alpha'],
+            )
+            self.create_follows(options['follows'], users, options['alpha'])
+            self.create_comments(
+                options['comments'], users, posts, options['alpha']
+            )
+        # bulk_create не вызывает сигналы, счётчики и индекс тегов
+        # пересчитываем сами.
+        directory.recount(Group.objects.all())
+        self.stdout.write(f'Связей с тегами: {tags.rebuild()}')
+
+    def random_date(self):
+        return self.now - self.span * self.rng.random() ** 2
+
+    def random_date_after(self, moment):
+        """Дата между moment и сейчас, чаще ближе к moment."""
+        return moment + (self.now - moment) * self.rng.random() ** 2
+
+    def create_users(self, count):
+        start = next_index(User.objects, 'username', 'user')
+        password = make_password(None)
+        objs = (
+            User(
+                username=f'user{start + number}',
+                first_name='Пользователь',
+                last_name=str(start + number),
+                password=password,
+            )
+            for number in range(count)
+        )
+        for batch in batched(objs):
+            User.objects.bulk_create(batch)
+        self.stdout.write(f'Пользователей: {count}')
+        # Популярность авторов задаётся порядком в списке.
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        self.rng.shuffle(user_ids)
+        return user_ids
+
+    def create_groups(self, count):
+        start = next_index(Group.objects, 'slug', 'group-')
+        Group.objects.bulk_create(
+            Group(
+                title=f'Группа {start + number}',
+                slug=f'group-{start + number}',
+                description=random_text(self.rng),
+            )
+            for number in range(count)
+        )
+        self.stdout.write(f'Групп: {count}')
+        return list(Group.objects.values_list('pk', flat=True))
+
+    def create_images(self, count):
+        directory = os.path.join(settings.MEDIA_ROOT, IMAGE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        names = []
+        for number in range(count):
+            name = f'{IMAGE_DIR}/image_{number}.png'
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            Image.new('RGB', (960, 339), color).save(
+                os.path.join(settings.MEDIA_ROOT, name)
+            )
+            names.append(name)
+        return names
+
+    def create_posts(self, count, users, groups, images, image_share, alpha):
+        weights = power_law_weights(len(users), alpha)
+        rng = self.rng
+        objs = (
+            Post(
+                text=random_post_text(rng),
+                author_id=rng.choices(users, cum_weights=weights)[0],
+                group_id=(
+                    rng.choice(groups) if groups and rng.random() < 0.5
+                    else None
+                ),
+                image=rng.choice(images) if rng.random() < image_share else '',
+                pub_date=self.random_date(),
+            )
+            for _ in range(count)
+        )
+        created = 0
+        for batch in batched(objs):
+            with transaction.atomic():
+                Post.objects.bulk_create(batch)
+            created += len(batch)
+            self.stdout.write(f'Постов: {created}/{count}')
+        return list(Post.objects.values_list('pk', 'pub_date'))
+
+    def create_follows(self, count, users, alpha):
+        weights = power_law_weights(len(users), alpha)
+        rng = self.rng
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user = rng.choice(users)
+            author = rng.choices(users, cum_weights=weights)[0]
+            if user != author:
+                pairs.add((user, author))
+        objs = (
+            Follow(user_id=user, author_id=author) for user, author in pairs
+        )
+        for batch in batched(objs):
+            Follow.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f'Подписок: {len(pairs)}')
+
+    def create_comments(self, count, users, posts, alpha):
+        if not posts:
+            return
+        weights = power_law_weights(len(posts), alpha)
+        rng = self.rng
+        picks = (
+            rng.choices(posts, cum_weights=weights)[0] for _ in range(count)
+        )
+        # Комментарий не старше своего поста.
+        objs = (
+            Comment(
+                post_id=post_id,
+                author_id=rng.choice(users),
+                text=random_text(rng, 1, 20),
+                created=self.random_date_after(pub_date),
+            )
+            for post_id, pub_date in picks
+        )
+        created = 0
+        for batch in batched(objs):
+            with transaction.atomic():
+                Comment.objects.bulk_create(batch)
+            created += len(batch)
+        self.stdout.write(f'Комментариев: {created}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.tags import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает индекс хештегов по текстам всех постов, горячих '
+        'и архивных, и пересчитывает число постов у тегов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Готово, связей: {total}'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.graph import FollowGraph
+from posts.models import FollowSuggestion
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает рекомендации авторов по графу подписок: '
+        'друзья друзей и co-follow.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        graph = FollowGraph.load()
+        self.stdout.write(
+            f'Граф: {graph.size} пользователей, '
+            f'{len(graph.out_indices)} подписок'
+        )
+        # Граф считается до транзакции: блокировка записи держится
+        # только на время замены строк.
+        rows = [
+            FollowSuggestion(user_id=user, author_id=author, score=score)
+            for user, author, score in graph.suggestions(
+                options['limit'], options['batch_size']
+            )
+        ]
+        with transaction.atomic():
+            FollowSuggestion.objects.all().delete()
+            FollowSuggestion.objects.bulk_create(rows, batch_size=5000)
+        self.stdout.write(self.style.SUCCESS(f'Рекомендаций: {len(rows)}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.directory import recount
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает число постов и дату последнего поста групп '
+        'для каталога. Нужна после первой миграции и массовых '
+        'QuerySet.update(), которые обходят сигналы.'
+    )
+
+    def handle(self, *args, **options):
+        groups = Group.objects.all()
+        recount(groups.iterator())
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово, групп: {groups.count()}')
+        )
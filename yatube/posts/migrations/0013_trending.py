@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_group_directory_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('group', 'Группа')], max_length=5)),
+                ('object_id', models.IntegerField()),
+                ('bucket', models.IntegerField(db_index=True)),
+                ('hits', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('group', 'Группа')], max_length=5)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('object_id', models.IntegerField()),
+                ('score', models.FloatField()),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingentry',
+            constraint=models.UniqueConstraint(fields=('kind', 'rank'), name='unique_trending_rank'),
+        ),
+        migrations.AddConstraint(
+            model_name='trendingbucket',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'bucket'), name='unique_trending_bucket'),
+        ),
+    ]
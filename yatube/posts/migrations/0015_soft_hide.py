@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
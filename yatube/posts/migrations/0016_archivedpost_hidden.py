@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_soft_hide'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
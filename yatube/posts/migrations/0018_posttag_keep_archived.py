@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_deleteduser'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='posttag',
+            name='post',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='posts.Post'),
+        ),
+    ]
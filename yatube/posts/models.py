@@ -9,11 +9,28 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Счётчики каталога групп, их ведут сигналы (posts.directory).
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post_at = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
+    # Скрыта до фонового удаления (posts.deletion).
+    hidden = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['-last_post_at'])]
 
     def __str__(self) -> str:
         return self.title
 
 
+class VisibleManager(models.Manager):
+    """Записи без скрытых до фонового удаления (posts.deletion)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(hidden=False)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -40,9 +57,14 @@ class Post(models.Model):
         verbose_name='Изображение',
         help_text='Загрузите изображение',
     )
+    hidden = models.BooleanField(default=False, editable=False)
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [models.Index(fields=['author', '-pub_date'])]
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -53,11 +75,13 @@ class Comment(models.Model):
         Post,
         on_delete=models.CASCADE,
         related_name='comments',
+        db_constraint=False,
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='comments',
+        db_constraint=False,
     )
     text = models.TextField(
         verbose_name='Комментарий',
@@ -71,11 +95,13 @@ class Follow(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='follower',
+        db_constraint=False,
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='following',
+        db_constraint=False,
     )
 
     class Meta:
@@ -85,3 +111,170 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый командой archive_posts."""
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        db_constraint=False,
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        db_constraint=False,
+    )
+    image = models.ImageField(upload_to='posts/', blank=True)
+    hidden = models.BooleanField(default=False, editable=False)
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Пост из архива'
+        verbose_name_plural = 'Архив постов'
+
+    def __str__(self) -> str:
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        db_constraint=False,
+    )
+    text = models.TextField(verbose_name='Комментарий')
+    created = models.DateTimeField()
+
+
+class FollowSuggestion(models.Model):
+    """Рекомендованный автор; таблицу пересобирает rebuild_suggestions."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['-score']
+        indexes = [models.Index(fields=['user', '-score'])]
+
+
+class TrendingBucket(models.Model):
+    """Активность поста или группы за один интервал времени."""
+
+    POST = 'post'
+    GROUP = 'group'
+    KINDS = ((POST, 'Пост'), (GROUP, 'Группа'))
+
+    kind = models.CharField(max_length=5, choices=KINDS)
+    object_id = models.IntegerField()
+    # Номер интервала: unix-время // TRENDING_BUCKET_SECONDS.
+    bucket = models.IntegerField(db_index=True)
+    hits = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'object_id', 'bucket'],
+                name='unique_trending_bucket'
+            )
+        ]
+
+
+class TrendingEntry(models.Model):
+    """Строка топа; таблицу пересобирает compact_trending."""
+
+    kind = models.CharField(max_length=5, choices=TrendingBucket.KINDS)
+    rank = models.PositiveSmallIntegerField()
+    object_id = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'rank'],
+                name='unique_trending_rank'
+            )
+        ]
+
+
+class Tag(models.Model):
+    """Хештег из текста постов; индекс ведёт posts.tags."""
+
+    name = models.CharField(max_length=50, unique=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+    )
+    # Без ограничения в базе: после архивации post_id указывает на
+    # ArchivedPost с тем же id.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        db_constraint=False,
+    )
+    # Копия Post.pub_date: лента тега читается только из индекса.
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [models.Index(fields=['tag', '-pub_date'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tag', 'post'],
+                name='unique_post_tag'
+            )
+        ]
+
+
+class DeletedUser(models.Model):
+    """
+    Пользователь, которого дочищает фоновая задача posts.deletion.
+
+    Отдельная отметка, а не is_active: обычная деактивация в админке
+    только закрывает вход и не прячет профиль и комментарии.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='deletion',
+    )
+    created = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,76 @@
+"""
+Кэш страницы автора.
+
+По ключу profile:<id> лежат автор с числом горячих постов (одним
+запросом через annotate) и первая страница его постов с группами.
+Имя пользователя переводится в id через отдельный ключ; запись
+проверяется по username, поэтому переименование не отдаёт чужую
+страницу.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.http import Http404
+
+from .models import User
+
+
+def profile_key(author_id):
+    return f'profile:{author_id}'
+
+
+def username_key(username):
+    return f'profile_id:{username}'
+
+
+def invalidate_profile(author_id):
+    cache.delete(profile_key(author_id))
+
+
+def get_profile(username):
+    """(автор с post_count, первая страница горячих постов) или 404."""
+    author_id = cache.get(username_key(username))
+    if author_id is not None:
+        found = cache.get(profile_key(author_id))
+        if found is not None and found[0].username == username:
+            return found
+    author = (
+        User.objects.filter(username=username, deletion__isnull=True)
+        .annotate(post_count=Count(
+            'posts', filter=Q(posts__hidden=False)
+        )).first()
+    )
+    if author is None:
+        raise Http404('Нет такого пользователя')
+    head = list(
+        author.posts.select_related('group')[:settings.PAGINATOR_COUNT]
+    )
+    cache.set_many({
+        username_key(username): author.pk,
+        profile_key(author.pk): (author, head),
+    }, settings.PROFILE_TIMEOUT)
+    return author, head
+
+
+class AuthorPosts:
+    """
+    Горячие посты автора для ChainedFeed: число и первая страница
+    берутся из кэша профиля, остальные страницы — из базы.
+    """
+
+    def __init__(self, author, head):
+        self.author = author
+        self.head = head
+
+    def count(self):
+        return self.author.post_count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        stop = index.stop
+        if stop is not None and stop <= settings.PAGINATOR_COUNT:
+            return self.head[index]
+        return list(
+            self.author.posts.select_related('group')[index]
+        )
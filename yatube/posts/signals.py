@@ -0,0 +1,156 @@
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from core.holes import bump_page_generation
+from core.routers import partition_for
+
+from .directory import post_added, post_removed
+from .follows import invalidate_followed
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, Post, User,
+)
+from .profiles import invalidate_profile
+from .tags import unindex_posts
+from .timelines import invalidate_timeline
+
+
+def _in_other_database(model, instance):
+    return partition_for(model) != instance._state.db
+
+
+@receiver(pre_delete, sender=Post)
+def delete_post_comments(sender, instance, **kwargs):
+    """Каскад для комментариев, вынесенных в отдельную базу."""
+    if _in_other_database(Comment, instance):
+        Comment.objects.filter(post_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=ArchivedPost)
+def uncount_post_tags(sender, instance, **kwargs):
+    # Скрытый пост убран из индекса ещё в posts.deletion.
+    if not instance.hidden:
+        unindex_posts([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def delete_user_relations(sender, instance, **kwargs):
+    """Каскад для комментариев и подписок из отдельных баз."""
+    if _in_other_database(Comment, instance):
+        Comment.objects.filter(author_id=instance.pk).delete()
+    if _in_other_database(Follow, instance):
+        Follow.objects.filter(user_id=instance.pk).delete()
+        Follow.objects.filter(author_id=instance.pk).delete()
+    if _in_other_database(ArchivedPost, instance):
+        ArchivedComment.objects.filter(author_id=instance.pk).delete()
+        ArchivedPost.all_objects.filter(author_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=Group)
+def detach_archived_posts(sender, instance, **kwargs):
+    """SET_NULL для архивных постов из отдельной базы."""
+    if _in_other_database(ArchivedPost, instance):
+        ArchivedPost.all_objects.filter(group_id=instance.pk).update(
+            group=None
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_author_timeline(sender, instance, **kwargs):
+    invalidate_timeline(instance.author_id)
+    invalidate_profile(instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_followed_ids(sender, instance, **kwargs):
+    invalidate_followed(instance.user_id)
+
+
+# Группа поста не загружена (only/defer) — перенос не отслеживаем.
+_UNKNOWN = object()
+
+
+@receiver(post_init, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    # Через __dict__, чтобы не дочитывать отложенное поле из базы.
+    instance._saved_group_id = instance.__dict__.get('group_id', _UNKNOWN)
+
+
+def _post_scopes(post, *group_ids):
+    """Области общих страниц (core.holes), где виден пост."""
+    scopes = ['posts', f'post:{post.pk}', f'author:{post.author.username}']
+    group_ids = {
+        group_id for group_id in group_ids
+        if group_id and group_id is not _UNKNOWN
+    }
+    if group_ids:
+        scopes.append('groups')
+        scopes.extend(
+            f'group:{slug}' for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True)
+        )
+    return scopes
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, **kwargs):
+    # До count_group_post: тот забывает прежнюю группу поста.
+    bump_page_generation(*_post_scopes(
+        instance, instance._saved_group_id, instance.group_id
+    ))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_pages(sender, instance, **kwargs):
+    bump_page_generation(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Post)
+def count_group_post(sender, instance, created, **kwargs):
+    """Счётчики каталога групп: новый пост или перенос в другую."""
+    old = None if created else instance._saved_group_id
+    new = instance.group_id
+    if old is not _UNKNOWN and old != new:
+        if old:
+            post_removed(old)
+        if new:
+            post_added(new, instance.pub_date)
+    instance._saved_group_id = new
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def uncount_group_post(sender, instance, **kwargs):
+    if instance.group_id and not instance.hidden:
+        post_removed(instance.group_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def reset_shared_pages(sender, **kwargs):
+    """Название группы и имя автора есть почти на всех общих страницах."""
+    bump_page_generation()
+
+
+@receiver(post_save, sender=User)
+def reset_shared_pages_for_user(sender, created, update_fields=None,
+                                **kwargs):
+    # Новый пользователь ещё нигде не виден, а вход обновляет только
+    # last_login — страниц это не меняет.
+    if created or update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_page_generation()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_author_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.pk)
@@ -0,0 +1,178 @@
+"""
+Хештеги постов.
+
+Теги разбираются из текста при сохранении поста в post_create и
+post_edit и пишутся в PostTag вместе с pub_date, поэтому лента тега
+читает страницу по индексу (tag, -pub_date), а число постов берёт из
+Tag.post_count без COUNT. Архивация сохраняет id поста, поэтому его
+строки индекса остаются на месте, и лента тега продолжается в архив.
+"""
+import re
+
+from django.db import router, transaction
+from django.db.models import Count, F
+
+from core.holes import bump_page_generation
+
+from .models import ArchivedPost, Post, PostTag, Tag
+
+TAG_RE = re.compile(r'(?<![\w#])#(\w{1,50})')
+
+
+def extract_tags(text):
+    return {name.lower() for name in TAG_RE.findall(text)}
+
+
+def index_post(post):
+    """Приводит индекс тегов поста к его текущему тексту."""
+    names = extract_tags(post.text)
+    current = dict(
+        PostTag.objects.filter(post=post).values_list('tag__name', 'pk')
+    )
+    removed = [pk for name, pk in current.items() if name not in names]
+    added = names - current.keys()
+    if removed:
+        Tag.objects.filter(post_tags__in=removed).update(
+            post_count=F('post_count') - 1
+        )
+        PostTag.objects.filter(pk__in=removed).delete()
+    if added:
+        for name in added:
+            Tag.objects.get_or_create(name=name)
+        tags = Tag.objects.filter(name__in=added)
+        PostTag.objects.bulk_create(
+            PostTag(tag=tag, post=post, pub_date=post.pub_date)
+            for tag in tags
+        )
+        tags.update(post_count=F('post_count') + 1)
+    # Лента тега показывает текст поста, поэтому сбрасываем её и без
+    # изменения набора тегов.
+    for name in names | current.keys():
+        bump_page_generation(f'tag:{name}')
+
+
+def unindex_posts(post_ids):
+    """Убирает посты, горячие или архивные, из индекса."""
+    rows = PostTag.objects.filter(post_id__in=post_ids)
+    counts = rows.order_by().values('tag_id', 'tag__name').annotate(
+        total=Count('pk')
+    )
+    for row in counts:
+        Tag.objects.filter(pk=row['tag_id']).update(
+            post_count=F('post_count') - row['total']
+        )
+        bump_page_generation(f'tag:{row["tag__name"]}')
+    rows.delete()
+
+
+def rebuild(batch_size=1000):
+    """
+    Сверяет индекс с текстами видимых постов, горячих и архивных, и
+    пересчитывает Tag.post_count; возвращает число связей.
+
+    Каждая порция постов сверяется со своими строками в отдельной
+    короткой транзакции: ленты тегов не видят пустого индекса, а
+    блокировка записи в SQLite не держится всю пересборку.
+    """
+    tags = {}
+    for model in (Post, ArchivedPost):
+        last = 0
+        while True:
+            posts = list(
+                model.objects.filter(pk__gt=last).order_by('pk')
+                .values_list('id', 'text', 'pub_date')[:batch_size]
+            )
+            if not posts:
+                break
+            last = posts[-1][0]
+            _sync(posts, tags)
+    _drop_orphans(batch_size)
+    for tag in Tag.objects.annotate(total=Count('post_tags')):
+        if tag.post_count != tag.total:
+            tag.post_count = tag.total
+            tag.save(update_fields=['post_count'])
+    bump_page_generation()
+    return PostTag.objects.count()
+
+
+def _sync(posts, tags):
+    pub_dates = {}
+    wanted = set()
+    for post_id, text, pub_date in posts:
+        pub_dates[post_id] = pub_date
+        for name in extract_tags(text):
+            if name not in tags:
+                tags[name] = Tag.objects.get_or_create(name=name)[0].pk
+            wanted.add((tags[name], post_id))
+    with transaction.atomic(using=router.db_for_write(PostTag)):
+        current = {
+            (tag_id, post_id): pk
+            for pk, tag_id, post_id in PostTag.objects.filter(
+                post_id__in=pub_dates
+            ).values_list('pk', 'tag_id', 'post_id')
+        }
+        PostTag.objects.filter(pk__in=[
+            pk for key, pk in current.items() if key not in wanted
+        ]).delete()
+        PostTag.objects.bulk_create(
+            PostTag(
+                tag_id=tag_id, post_id=post_id, pub_date=pub_dates[post_id]
+            )
+            for tag_id, post_id in wanted - current.keys()
+        )
+
+
+def _drop_orphans(batch_size):
+    """Удаляет строки индекса удалённых и скрытых постов."""
+    last = 0
+    while True:
+        rows = list(
+            PostTag.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', 'post_id')[:batch_size]
+        )
+        if not rows:
+            return
+        last = rows[-1][0]
+        post_ids = {post_id for _, post_id in rows}
+        alive = set(
+            Post.objects.filter(pk__in=post_ids).values_list('pk', flat=True)
+        ) | set(
+            ArchivedPost.objects.filter(pk__in=post_ids)
+            .values_list('pk', flat=True)
+        )
+        PostTag.objects.filter(pk__in=[
+            pk for pk, post_id in rows if post_id not in alive
+        ]).delete()
+
+
+class TagPosts:
+    """
+    Посты тега для Paginator: страница id из индекса, затем in_bulk.
+
+    Архивные посты старше горячих, поэтому, как в ChainedFeed, они
+    идут в конце ленты; архив читается, только если страница до него
+    дошла.
+    """
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def count(self):
+        return self.tag.post_count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = list(
+            PostTag.objects.filter(tag=self.tag).order_by('-pub_date')
+            .values_list('post_id', flat=True)[index]
+        )
+        posts = Post.objects.select_related('author', 'group').in_bulk(ids)
+        rest = [post_id for post_id in ids if post_id not in posts]
+        if rest:
+            # Архив может жить в другой базе: prefetch, не JOIN.
+            posts.update(
+                ArchivedPost.objects.prefetch_related('author', 'group')
+                .in_bulk(rest)
+            )
+        return [posts[post_id] for post_id in ids if post_id in posts]
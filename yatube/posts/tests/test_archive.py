@@ -0,0 +1,78 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR_COUNT=3)
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        old = timezone.now() - datetime.timedelta(days=400)
+        for number in range(5):
+            post = Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+            if number < 3:
+                Post.objects.filter(pk=post.pk).update(
+                    pub_date=old + datetime.timedelta(days=number)
+                )
+        cls.old_post = Post.objects.order_by('pub_date').first()
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        call_command('archive_posts', days=90, stdout=io.StringIO())
+
+    def test_old_posts_are_moved(self):
+        """Старые посты и их комментарии переезжают в архив."""
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(ArchivedComment.objects.count(), 1)
+
+    def test_feeds_continue_into_archive(self):
+        """Лента после горячих постов продолжается архивными."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[ArchiveTest.group.slug]),
+            reverse('posts:profile', args=[ArchiveTest.user.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context['page_obj']
+                second = self.client.get(url + '?page=2').context['page_obj']
+                self.assertEqual(first.paginator.count, 5)
+                texts = [post.text for post in first] + [
+                    post.text for post in second
+                ]
+                self.assertEqual(
+                    texts, [f'Пост {number}' for number in range(4, -1, -1)]
+                )
+                self.assertIsInstance(second[1], ArchivedPost)
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается вместе с комментариями."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=[ArchiveTest.old_post.pk])
+        )
+        self.assertTrue(response.context['is_archived'])
+        self.assertContains(response, 'Старый комментарий')
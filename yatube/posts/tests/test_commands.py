@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, Follow, Group, Post, PostTag, Tag, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class GenerateDataTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_generate_and_benchmark(self):
+        """Генератор наполняет базу, бенчмарк проходит по всем адресам."""
+        call_command(
+            'generate_data', users=20, groups=3, posts=200, follows=60,
+            comments=100, stdout=io.StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists()
+        )
+        self.assertGreater(Follow.objects.count(), 0)
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'day').count(), 1
+        )
+        for group in Group.objects.all():
+            self.assertEqual(group.post_count, group.posts.count())
+        for tag in Tag.objects.all():
+            self.assertEqual(
+                tag.post_count, PostTag.objects.filter(tag=tag).count()
+            )
+        self.assertTrue(Tag.objects.exists())
+
+        baseline = os.path.join(TEMP_MEDIA_ROOT, 'baseline.json')
+        stderr = io.StringIO()
+        call_command(
+            'benchmark_views', requests=3, save_baseline=baseline,
+            stdout=io.StringIO(), stderr=stderr,
+        )
+        self.assertNotIn('Нет сценария', stderr.getvalue())
+        with open(baseline) as baseline_file:
+            results = json.load(baseline_file)
+        self.assertIn('index', results)
+        self.assertIn('follow_index', results)
+        self.assertIn('group_index', results)
+        self.assertIn('trending', results)
+        self.assertIn('tag_list', results)
+        self.assertGreaterEqual(results['profile']['queries'], 1)
+
+    def test_generate_again_after_deletions(self):
+        """Повторный запуск после удалений не повторяет имена."""
+        options = dict(
+            users=3, groups=0, posts=10, follows=0, comments=0,
+            images=0, stdout=io.StringIO(),
+        )
+        call_command('generate_data', **options)
+        User.objects.filter(username='user0').delete()
+        call_command('generate_data', **options)
+        self.assertEqual(
+            set(User.objects.values_list('username', flat=True)),
+            {'user1', 'user2', 'user3', 'user4', 'user5'},
+        )
+        self.assertFalse(Group.objects.exists())
+        self.assertFalse(Post.objects.exclude(group=None).exists())
@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.jobs import run_batch
+from core.models import Job
+from posts.deletion import delete_group, delete_post, delete_user
+from posts.models import ArchivedPost, Comment, Follow, Group, Post, Tag
+from posts.tags import index_post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def run_jobs():
+    runs = 0
+    while run_batch():
+        runs += 1
+    return runs
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, DELETION_BATCH_SIZE=3)
+class BackgroundDeletionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Lev')
+        cls.reader = User.objects.create(username='Anna')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        author = BackgroundDeletionTest.author
+        self.posts = [
+            Post.objects.create(
+                author=author,
+                group=BackgroundDeletionTest.group,
+                text=f'Пост {number} #тег',
+            )
+            for number in range(2)
+        ]
+        for post in self.posts:
+            index_post(post)
+        self.posts[0].image = SimpleUploadedFile(
+            'small.gif', SMALL_GIF, content_type='image/gif'
+        )
+        self.posts[0].save()
+        for number in range(4):
+            Comment.objects.create(
+                post=self.posts[0],
+                author=BackgroundDeletionTest.reader,
+                text=f'Комментарий {number}',
+            )
+        Follow.objects.create(
+            user=BackgroundDeletionTest.reader, author=author
+        )
+
+    def test_post_is_hidden_then_purged(self):
+        """Пост сразу пропадает, комментарии и файл удаляются в фоне."""
+        post = self.posts[0]
+        path = post.image.path
+        delete_post(post)
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+        BackgroundDeletionTest.group.refresh_from_db()
+        self.assertEqual(BackgroundDeletionTest.group.post_count, 1)
+        self.assertEqual(Tag.objects.get().post_count, 1)
+        response = Client().get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(run_jobs(), 2)
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(os.path.exists(path))
+        BackgroundDeletionTest.group.refresh_from_db()
+        self.assertEqual(BackgroundDeletionTest.group.post_count, 1)
+        self.assertEqual(Tag.objects.get().post_count, 1)
+
+    def test_user_is_purged_in_batches(self):
+        """Пользователь скрыт сразу и удаляется порциями."""
+        author = BackgroundDeletionTest.author
+        delete_user(author)
+        self.assertFalse(Post.objects.exists())
+        response = Client().get(
+            reverse('posts:profile', args=[author.username])
+        )
+        self.assertEqual(response.status_code, 404)
+        # Подписка, 4 комментария и 2 поста — три шага по три строки.
+        self.assertEqual(run_jobs(), 3)
+        self.assertFalse(User.objects.filter(pk=author.pk).exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_user_posts_leave_counters_at_once(self):
+        """Посты удаляемого автора сразу не считаются в группе и теге."""
+        group = BackgroundDeletionTest.group
+        ArchivedPost.objects.create(
+            id=100, author=BackgroundDeletionTest.author, group=group,
+            text='Старый пост', pub_date=self.posts[0].pub_date,
+        )
+        Group.objects.filter(pk=group.pk).update(post_count=3)
+        delete_user(BackgroundDeletionTest.author)
+        group.refresh_from_db()
+        self.assertEqual(group.post_count, 0)
+        self.assertIsNone(group.last_post_at)
+        self.assertEqual(Tag.objects.get().post_count, 0)
+        run_jobs()
+        group.refresh_from_db()
+        self.assertEqual(group.post_count, 0)
+        self.assertEqual(Tag.objects.get().post_count, 0)
+
+    def test_user_archive_and_comments_are_hidden(self):
+        """Архивные посты и комментарии удаляемого автора не видны."""
+        author = BackgroundDeletionTest.author
+        archived = ArchivedPost.objects.create(
+            id=100, author=author, text='Старый пост',
+            pub_date=self.posts[0].pub_date,
+        )
+        post = Post.objects.create(
+            author=BackgroundDeletionTest.reader, text='Пост читателя'
+        )
+        Comment.objects.create(post=post, author=author, text='Скрытый')
+        delete_user(author)
+        client = Client()
+        response = client.get(
+            reverse('posts:post_detail', args=[archived.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'Старый пост')
+        response = client.get(reverse('posts:post_detail', args=[post.pk]))
+        self.assertNotContains(response, 'Скрытый')
+        run_jobs()
+        self.assertFalse(ArchivedPost.all_objects.exists())
+
+    def test_deactivated_user_stays_visible(self):
+        """Деактивация в админке не прячет профиль и комментарии."""
+        reader = BackgroundDeletionTest.reader
+        User.objects.filter(pk=reader.pk).update(is_active=False)
+        client = Client()
+        response = client.get(
+            reverse('posts:profile', args=[reader.username])
+        )
+        self.assertEqual(response.status_code, 200)
+        response = client.get(
+            reverse('posts:post_detail', args=[self.posts[0].pk])
+        )
+        self.assertContains(response, 'Комментарий 3')
+
+    def test_admin_confirmation_skips_collector(self):
+        """Страница подтверждения не обходит каскад удаляемого автора."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'pass'
+        )
+        client = Client()
+        client.force_login(admin)
+        url = reverse(
+            'admin:auth_user_delete', args=[BackgroundDeletionTest.author.pk]
+        )
+        with mock.patch(
+            'django.contrib.admin.utils.NestedObjects.collect'
+        ) as collect:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        collect.assert_not_called()
+        self.assertContains(response, BackgroundDeletionTest.author.username)
+
+    def test_group_is_detached_then_deleted(self):
+        """Посты остаются без группы, сама группа удаляется."""
+        group = BackgroundDeletionTest.group
+        delete_group(group)
+        response = Client().get(reverse('posts:group_list', args=['group']))
+        self.assertEqual(response.status_code, 404)
+        run_jobs()
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 2)
+
+    def test_admin_delete_is_deferred(self):
+        """Удаление в админке только скрывает пост."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'pass'
+        )
+        client = Client()
+        client.force_login(admin)
+        post = self.posts[1]
+        client.post(
+            reverse('admin:posts_post_delete', args=[post.pk]),
+            {'post': 'yes'},
+        )
+        self.assertTrue(Post.all_objects.get(pk=post.pk).hidden)
+        self.assertEqual(Job.objects.count(), 1)
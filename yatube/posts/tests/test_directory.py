@@ -0,0 +1,97 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            'Dmitry', 'dmitry@example.com', 'pass'
+        )
+        cls.first = Group.objects.create(
+            title='Первая', slug='first', description='Описание'
+        )
+        cls.second = Group.objects.create(
+            title='Вторая', slug='second', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self, group):
+        group.refresh_from_db()
+        return group.post_count, group.last_post_at
+
+    def test_counters_follow_posts(self):
+        """Создание, перенос и удаление поста меняют счётчики групп."""
+        first, second = GroupDirectoryTest.first, GroupDirectoryTest.second
+        old = Post.objects.create(
+            author=GroupDirectoryTest.user, group=first, text='Старый'
+        )
+        post = Post.objects.create(
+            author=GroupDirectoryTest.user, group=first, text='Пост'
+        )
+        self.assertEqual(self.counters(first), (2, post.pub_date))
+        post = Post.objects.get(pk=post.pk)
+        post.group = second
+        post.save()
+        self.assertEqual(self.counters(first), (1, old.pub_date))
+        self.assertEqual(self.counters(second), (1, post.pub_date))
+        post.delete()
+        self.assertEqual(self.counters(second), (0, None))
+
+    def test_admin_list_editable_moves_post(self):
+        """Смена группы в списке постов админки переносит счётчик."""
+        first, second = GroupDirectoryTest.first, GroupDirectoryTest.second
+        post = Post.objects.create(
+            author=GroupDirectoryTest.user, group=first, text='Пост'
+        )
+        client = Client()
+        client.force_login(GroupDirectoryTest.user)
+        client.post(reverse('admin:posts_post_changelist'), {
+            'form-TOTAL_FORMS': '1',
+            'form-INITIAL_FORMS': '1',
+            'form-0-id': str(post.pk),
+            'form-0-group': str(second.pk),
+            '_save': 'Сохранить',
+        })
+        self.assertEqual(self.counters(first), (0, None))
+        self.assertEqual(self.counters(second)[0], 1)
+
+    def test_recount_includes_archive(self):
+        """recount_groups считает и архивные посты."""
+        first = GroupDirectoryTest.first
+        old = timezone.now() - datetime.timedelta(days=400)
+        ArchivedPost.objects.create(
+            id=1000, author=GroupDirectoryTest.user, group=first,
+            text='Архив', pub_date=old,
+        )
+        Group.objects.filter(pk=first.pk).update(post_count=0)
+        call_command('recount_groups', stdout=io.StringIO())
+        self.assertEqual(self.counters(first), (1, old))
+
+    def test_directory_page(self):
+        """Каталог сортирует группы по последней активности."""
+        Post.objects.create(
+            author=GroupDirectoryTest.user,
+            group=GroupDirectoryTest.second,
+            text='Пост',
+        )
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('posts:group_index'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [GroupDirectoryTest.second, GroupDirectoryTest.first],
+        )
+        self.assertContains(response, 'Постов: 1')
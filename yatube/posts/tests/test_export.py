@@ -0,0 +1,136 @@
+import csv
+import datetime
+import io
+import json
+import warnings
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.staff = User.objects.create(username='admin', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост в группе',
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.staff,
+            text='Пост без группы',
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.staff, text='Комментарий'
+        )
+
+    def test_command_exports_jsonl(self):
+        """Команда выгружает посты и комментарии в JSONL."""
+        out = io.StringIO()
+        call_command('export_posts', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['post', 'post', 'comment'],
+        )
+        self.assertEqual(records[0]['author_username'], 'Dmitry')
+        self.assertEqual(records[0]['group_slug'], 'test-slug')
+
+    def test_command_filters_by_group(self):
+        """Фильтр по группе ограничивает и посты, и комментарии."""
+        out = io.StringIO()
+        call_command('export_posts', '--group', 'test-slug',
+                     '--format', 'csv', stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row['post_id'] or row['id'] for row in rows},
+                         {str(ExportTest.post.pk)})
+
+    def test_export_view_only_for_staff(self):
+        """Выгрузка по HTTP доступна только персоналу."""
+        client = Client()
+        client.force_login(ExportTest.user)
+        response = client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+        client.force_login(ExportTest.staff)
+        response = client.get(
+            reverse('posts:export') + '?author=admin'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], ExportTest.other_post.pk)
+
+    def test_export_view_rejects_bad_dates(self):
+        """Мусор и несуществующие даты дают 400, а не 500 или пропуск."""
+        client = Client()
+        client.force_login(ExportTest.staff)
+        for query in ('?since=2024-02-30', '?until=вчера'):
+            with self.subTest(query=query):
+                response = client.get(reverse('posts:export') + query)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_export_view_rejects_unknown_format(self):
+        client = Client()
+        client.force_login(ExportTest.staff)
+        response = client.get(reverse('posts:export') + '?format=xml')
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_until_includes_the_whole_day(self):
+        """until — последний день выгрузки; границы дат без предупреждений."""
+        today = timezone.localdate().isoformat()
+        out = io.StringIO()
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            call_command(
+                'export_posts', '--since', today, '--until', today,
+                stdout=out,
+            )
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+        out = io.StringIO()
+        call_command(
+            'export_posts', '--until', yesterday.isoformat(), stdout=out
+        )
+        self.assertEqual(out.getvalue(), '')
+
+    def test_archive_is_exported(self):
+        """Архивные посты и комментарии попадают в выгрузку."""
+        archived = ArchivedPost.objects.create(
+            id=100, author=ExportTest.user, group=ExportTest.group,
+            text='Старый пост', pub_date=ExportTest.post.pub_date,
+        )
+        ArchivedComment.objects.create(
+            id=100, post=archived, author=ExportTest.staff,
+            text='Старый комментарий', created=ExportTest.post.pub_date,
+        )
+        out = io.StringIO()
+        call_command('export_posts', '--group', 'test-slug', stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [(record['type'], record['id']) for record in records], [
+                ('post', ExportTest.post.pk), ('post', 100),
+                ('comment', Comment.objects.get().pk), ('comment', 100),
+            ],
+        )
+        self.assertEqual(records[1]['author_username'], 'Dmitry')
+        self.assertEqual(records[1]['group_slug'], 'test-slug')
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.follows import FollowState, followed_key
+from posts.models import DeletedUser, Follow
+
+User = get_user_model()
+
+
+class FollowStateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.authors = [
+            User.objects.create(username=f'author{number}')
+            for number in range(5)
+        ]
+        for author in cls.authors[:3]:
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(FollowStateTest.user)
+        cache.clear()
+
+    def test_many_authors_one_query(self):
+        """Подписки на любое число авторов проверяются одним запросом."""
+        state = FollowState(FollowStateTest.user)
+        with self.assertNumQueries(1):
+            result = [author in state for author in FollowStateTest.authors]
+        self.assertEqual(result, [True, True, True, False, False])
+        with self.assertNumQueries(0):
+            FollowState(FollowStateTest.user).ids
+
+    def test_follow_and_unfollow_reset_cache(self):
+        """Подписка и отписка сбрасывают кэш подписок."""
+        author = FollowStateTest.authors[4]
+        FollowState(FollowStateTest.user).ids
+        self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertIn(author, FollowState(FollowStateTest.user))
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[author.username])
+        )
+        self.assertNotIn(author, FollowState(FollowStateTest.user))
+
+    def test_follow_with_stale_cache(self):
+        """Устаревший кэш подписок не приводит к дублю и ошибке."""
+        author = FollowStateTest.authors[4]
+        FollowState(FollowStateTest.user).ids
+        # Подписка из другого процесса: сигналы этого кэш не сбросили.
+        Follow.objects.bulk_create(
+            [Follow(user=FollowStateTest.user, author=author)]
+        )
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Follow.objects.filter(author=author).count(), 1)
+
+    def test_follow_after_unfollow_elsewhere(self):
+        """Отписка мимо кэша не мешает подписаться снова."""
+        author = FollowStateTest.authors[0]
+        FollowState(FollowStateTest.user).ids
+        Follow.objects.filter(author=author)._raw_delete(
+            router.db_for_write(Follow)
+        )
+        self.assertIn(author.pk, cache.get(followed_key(
+            FollowStateTest.user.pk
+        )))
+        self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertTrue(Follow.objects.filter(author=author).exists())
+        self.assertIn(author, FollowState(FollowStateTest.user))
+
+    def test_follow_deleted_author(self):
+        """На удаляемого в фоне автора подписаться нельзя."""
+        author = FollowStateTest.authors[3]
+        DeletedUser.objects.create(user=author)
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Follow.objects.filter(author=author).exists())
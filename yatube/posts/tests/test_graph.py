@@ -0,0 +1,100 @@
+import collections
+import io
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.graph import MAX_CO_FOLLOWERS, FollowGraph
+from posts.models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    def test_friend_of_friend_and_co_follow(self):
+        """Друзья друзей ранжируются выше co-follow, подписки исключены."""
+        # 1 -> 2 -> 3: автор 3 — друг друга для 1.
+        # 1 -> 4 <- 5 -> 6: автор 6 — co-follow для 1.
+        graph = FollowGraph.from_edges(
+            [1, 2, 1, 5, 5], [2, 3, 4, 4, 6]
+        )
+        suggestions = [
+            (author, score) for user, author, score in graph.suggestions()
+            if user == 1
+        ]
+        self.assertEqual(suggestions, [(3, 1.0), (6, 0.5)])
+
+    def test_limit_per_user(self):
+        graph = FollowGraph.from_edges(
+            [1, 2, 2, 2], [2, 3, 4, 5]
+        )
+        suggestions = [s for s in graph.suggestions(limit=2) if s[0] == 1]
+        self.assertEqual(len(suggestions), 2)
+
+    def test_matches_dense_scores(self):
+        """Разреженный подсчёт совпадает с прямым перебором."""
+        rng = np.random.default_rng(7)
+        edges = {
+            (int(user), int(author))
+            for user, author in rng.integers(0, 30, size=(150, 2))
+            if user != author
+        }
+        users, authors = zip(*edges)
+        graph = FollowGraph.from_edges(users, authors)
+        expected = collections.Counter()
+        following = collections.defaultdict(set)
+        for user, author in edges:
+            following[user].add(author)
+        for user, authors_of_user in following.items():
+            for author in authors_of_user:
+                for candidate in following[author]:
+                    expected[user, candidate] += 1.0
+                readers = sorted(
+                    reader for reader, followed in following.items()
+                    if author in followed
+                )[:MAX_CO_FOLLOWERS]
+                for reader in readers:
+                    for candidate in following[reader]:
+                        expected[user, candidate] += 0.5
+        expected = {
+            (user, candidate): score
+            for (user, candidate), score in expected.items()
+            if candidate != user and candidate not in following[user]
+        }
+        result = {
+            (user, author): score
+            for user, author, score in graph.suggestions(limit=100)
+        }
+        self.assertEqual(result, expected)
+
+
+class SuggestionsViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.friend = User.objects.create(username='Lev')
+        cls.author = User.objects.create(username='Anna')
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.author)
+
+    def test_suggestions_are_rebuilt_and_shown(self):
+        """Команда сохраняет рекомендации, лента подписок их показывает."""
+        call_command('rebuild_suggestions', stdout=io.StringIO())
+        self.assertTrue(FollowSuggestion.objects.filter(
+            user=SuggestionsViewTest.user, author=SuggestionsViewTest.author
+        ).exists())
+        client = Client()
+        client.force_login(SuggestionsViewTest.user)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [s.author for s in response.context['suggestions']],
+            [SuggestionsViewTest.author],
+        )
+        response = client.get(
+            reverse('posts:profile', args=[SuggestionsViewTest.author])
+        )
+        self.assertEqual(response.context['suggestions'], [])
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class Jinja2PagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый текст',
+            image=SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='Тестовый комментарий'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(Jinja2PagesTest.user)
+        cache.clear()
+
+    def test_engines_render_same_pages(self):
+        """Страницы на Jinja2 совпадают со страницами на Django."""
+        post = Jinja2PagesTest.post
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_index'),
+            reverse('posts:trending'),
+            reverse('posts:group_list', args=[post.group.slug]),
+            reverse('posts:profile', args=[post.author.username]),
+            reverse('posts:post_detail', args=[post.pk]),
+            reverse('posts:post_edit', args=[post.pk]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                pages = []
+                for engine in ('django', 'jinja2'):
+                    cache.clear()
+                    with self.settings(POSTS_TEMPLATE_ENGINE=engine):
+                        content = self.client.get(url).content.decode()
+                    content = content.split('csrfmiddlewaretoken')[0]
+                    pages.append(content.split())
+                self.assertEqual(pages[0], pages[1])
+
+    def test_jinja2_page_content(self):
+        """Шаблоны Jinja2 выводят комментарии и форму."""
+        post = Jinja2PagesTest.post
+        with self.settings(POSTS_TEMPLATE_ENGINE='jinja2'):
+            content = self.client.get(
+                reverse('posts:post_detail', args=[post.pk])
+            ).content.decode()
+        self.assertIn('Тестовый комментарий', content)
+        self.assertIn('class="form-control"', content)
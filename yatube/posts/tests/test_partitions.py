@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_PARTITIONS={
+    'posts.comment': 'comments',
+    'posts.follow': 'follows',
+})
+class PartitionTest(TransactionTestCase):
+    databases = {'default', 'comments', 'follows'}
+    partitions = (('comments', Comment), ('follows', Follow))
+
+    def setUp(self):
+        for alias, model in self.partitions:
+            with connections[alias].schema_editor() as editor:
+                editor.create_model(model)
+        self.user = User.objects.create(username='Dmitry')
+        self.author = User.objects.create(username='Lev')
+        self.post = Post.objects.create(author=self.author, text='Текст')
+        self.client = Client()
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def tearDown(self):
+        for alias, model in self.partitions:
+            with connections[alias].schema_editor() as editor:
+                editor.delete_model(model)
+
+    def test_comment_is_stored_in_its_database(self):
+        """Комментарий пишется в свою базу и виден на странице поста."""
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Комментарий'},
+        )
+        self.assertEqual(Comment.objects.using('comments').count(), 1)
+        self.assertFalse(Comment.objects.using('default').exists())
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(response, 'Комментарий')
+
+    def test_follow_index_reads_follows_database(self):
+        """Лента подписок работает с подписками из другой базы."""
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertEqual(Follow.objects.using('follows').count(), 1)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertIn(self.post, response.context['page_obj'])
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertTrue(response.context['following'])
+
+    def test_cascade_reaches_other_databases(self):
+        """Удаление автора чистит его подписки и комментарии к постам."""
+        Follow.objects.create(user=self.user, author=self.author)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        self.author.delete()
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
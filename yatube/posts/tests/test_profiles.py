@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.holes import bump_page_generation
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR_COUNT=2)
+class ProfileQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Lev')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for number in range(3):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {number}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('posts:profile', args=['Lev'])
+
+    def test_profile_query_count(self):
+        """Автор, число постов и страница с группами — три запроса."""
+        # Автор с числом постов, первая страница и число постов архива.
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        self.assertContains(response, 'все записи группы', count=2)
+        bump_page_generation()
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_new_post_resets_profile(self):
+        """Новый пост сбрасывает кэш профиля автора."""
+        self.client.get(self.url)
+        Post.objects.create(author=ProfileQueriesTest.author, text='Свежий')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 4)
+        self.assertContains(response, 'Свежий')
+
+    def test_second_page_and_rename(self):
+        """Вторая страница читается из базы, старое имя даёт 404."""
+        self.client.get(self.url)
+        response = self.client.get(self.url + '?page=2')
+        self.assertEqual(len(response.context['page_obj']), 1)
+        author = ProfileQueriesTest.author
+        author.username = 'Leo'
+        author.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.get(reverse('posts:profile', args=['Leo']))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,105 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedPost, Post, PostTag, Tag
+from posts.tags import extract_tags
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR_COUNT=2)
+class TagsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(TagsTest.user)
+
+    def create(self, text):
+        self.client.post(reverse('posts:post_create'), {'text': text})
+        return Post.objects.latest('pub_date')
+
+    def counts(self):
+        return dict(Tag.objects.values_list('name', 'post_count'))
+
+    def test_extract_tags(self):
+        """Теги без учёта регистра, без якорей и двойных решёток."""
+        self.assertEqual(
+            extract_tags('#Котики и #котики, a#b, ##x, #чай_2'),
+            {'котики', 'чай_2'},
+        )
+
+    def test_create_edit_delete_keep_index(self):
+        """Создание, правка и удаление поста обновляют индекс."""
+        post = self.create('Утро #кофе #книги')
+        self.assertEqual(self.counts(), {'кофе': 1, 'книги': 1})
+        self.client.post(
+            reverse('posts:post_edit', args=[post.pk]),
+            {'text': 'Утро #кофе #чай'},
+        )
+        self.assertEqual(
+            self.counts(), {'кофе': 1, 'книги': 0, 'чай': 1}
+        )
+        post.delete()
+        self.assertEqual(
+            self.counts(), {'кофе': 0, 'книги': 0, 'чай': 0}
+        )
+        self.assertFalse(PostTag.objects.exists())
+
+    def test_tag_feed(self):
+        """Лента тега читает индекс по дате и отдаёт 404 без тега."""
+        posts = [self.create(f'Пост {number} #Кофе') for number in range(3)]
+        self.create('Без тегов')
+        url = reverse('posts:tag_list', args=['кофе'])
+        with self.assertNumQueries(3):
+            response = Client().get(url)
+        self.assertEqual(
+            list(response.context['page_obj']), posts[:0:-1]
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        response = Client().get(url + '?page=2')
+        self.assertEqual(list(response.context['page_obj']), posts[:1])
+        response = Client().get(reverse('posts:tag_list', args=['нет']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_backfill_command(self):
+        """index_tags строит индекс для уже существующих постов."""
+        Post.objects.create(author=TagsTest.user, text='#старый пост')
+        Post.objects.create(author=TagsTest.user, text='#Старый #новый')
+        call_command('index_tags', stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'старый': 2, 'новый': 1})
+        self.assertEqual(PostTag.objects.count(), 3)
+
+    def test_archived_posts_stay_in_feed(self):
+        """Архивация не убирает пост из ленты тега и из пересборки."""
+        posts = [self.create(f'Пост {number} #кофе') for number in range(3)]
+        Post.objects.filter(pk=posts[0].pk).update(
+            pub_date=timezone.now() - datetime.timedelta(days=400)
+        )
+        call_command('archive_posts', days=90, stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'кофе': 3})
+        url = reverse('posts:tag_list', args=['кофе'])
+        response = Client().get(url + '?page=2')
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [ArchivedPost.objects.get(pk=posts[0].pk)],
+        )
+        PostTag.objects.create(
+            tag=Tag.objects.get(), post_id=1000, pub_date=timezone.now()
+        )
+        call_command('index_tags', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'кофе': 3})
+        self.assertEqual(
+            set(PostTag.objects.values_list('post_id', flat=True)),
+            {post.pk for post in posts},
+        )
@@ -0,0 +1,83 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Post
+from posts.timelines import MergedFollowFeed, get_timelines
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR_COUNT=2, TIMELINE_LENGTH=3)
+class MergedFollowFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        authors = [
+            User.objects.create(username='Lev'),
+            User.objects.create(username='Anna'),
+        ]
+        start = timezone.now() - datetime.timedelta(days=1)
+        for number in range(6):
+            post = Post.objects.create(
+                author=authors[number % 2], text=f'Пост {number}'
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=start + datetime.timedelta(minutes=number)
+            )
+        for author in authors:
+            Follow.objects.create(user=cls.user, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(MergedFollowFeedTest.user)
+        cache.clear()
+
+    def texts(self, page):
+        response = self.client.get(
+            reverse('posts:follow_index') + f'?page={page}'
+        )
+        return [post.text for post in response.context['page_obj']]
+
+    def test_pages_match_sql_order(self):
+        """Слияние лент и SQL для глубоких страниц дают один порядок."""
+        texts = self.texts(1) + self.texts(2) + self.texts(3)
+        self.assertEqual(
+            texts, [f'Пост {number}' for number in range(5, -1, -1)]
+        )
+
+    def test_new_post_resets_author_timeline(self):
+        """Новый пост автора сразу попадает в ленту подписчика."""
+        self.texts(1)
+        author = User.objects.get(username='Lev')
+        Post.objects.create(author=author, text='Свежий пост')
+        self.assertEqual(self.texts(1)[0], 'Свежий пост')
+
+    def test_missing_timelines_load_in_one_query(self):
+        """Ленты всех авторов читаются одним запросом, COUNT не нужен."""
+        authors = list(User.objects.exclude(username='Dmitry'))
+        with self.assertNumQueries(1):
+            timelines = get_timelines([author.pk for author in authors])
+        self.assertEqual([total for total, _ in timelines], [3, 3])
+        # Пользователь без постов тоже кэшируется.
+        feed = MergedFollowFeed(
+            [author.pk for author in authors]
+            + [MergedFollowFeedTest.user.pk]
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(feed.count(), 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(MergedFollowFeed(feed.author_ids).count(), 6)
+
+    def test_equal_dates_across_boundary(self):
+        """Посты с одной датой не повторяются и не теряются."""
+        Post.objects.update(pub_date=timezone.now())
+        texts = self.texts(1) + self.texts(2) + self.texts(3)
+        self.assertEqual(len(texts), 6)
+        self.assertEqual(
+            set(texts), {f'Пост {number}' for number in range(6)}
+        )
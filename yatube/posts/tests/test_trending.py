@@ -0,0 +1,92 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, TrendingBucket, TrendingEntry
+from posts.trending import compact, record, trending_groups, trending_posts
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_COUNT=2)
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Dmitry')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(TrendingTest.user)
+
+    def test_views_record_activity(self):
+        """Новый пост и комментарий пишутся в текущий интервал."""
+        self.client.post(reverse('posts:post_create'), {'text': 'Новый'})
+        post = TrendingTest.posts[0]
+        for _ in range(2):
+            self.client.post(
+                reverse('posts:add_comment', args=[post.pk]),
+                {'text': 'Комментарий'},
+            )
+        self.assertEqual(TrendingBucket.objects.get(
+            kind=TrendingBucket.POST, object_id=post.pk
+        ).hits, 2)
+        self.assertEqual(TrendingBucket.objects.get(
+            kind=TrendingBucket.GROUP, object_id=TrendingTest.group.pk
+        ).hits, 2)
+
+    def test_compaction_ranks_with_decay(self):
+        """Свежая активность весит больше старой, топ ограничен."""
+        now = timezone.now()
+        old, fresh, quiet = TrendingTest.posts
+        record(TrendingBucket.POST, old.pk, 3, now - datetime.timedelta(
+            hours=12
+        ))
+        record(TrendingBucket.POST, fresh.pk, 1, now)
+        record(TrendingBucket.POST, quiet.pk, 1, now - datetime.timedelta(
+            hours=1
+        ))
+        record(TrendingBucket.POST, quiet.pk, 5, now - datetime.timedelta(
+            days=3
+        ))
+        self.assertEqual(compact(now), 2)
+        self.assertEqual(trending_posts(), [fresh, quiet])
+        # Интервалы старше окна удалены.
+        self.assertEqual(TrendingBucket.objects.count(), 3)
+
+    def test_page_reads_ready_top(self):
+        """Страница читает готовый топ без агрегации."""
+        post = TrendingTest.posts[1]
+        record(TrendingBucket.POST, post.pk, 1)
+        record(TrendingBucket.GROUP, TrendingTest.group.pk, 1)
+        call_command('compact_trending', stdout=io.StringIO())
+        self.assertEqual(TrendingEntry.objects.count(), 2)
+        with self.assertNumQueries(4):
+            response = Client().get(reverse('posts:trending'))
+        self.assertEqual(response.context['posts'], [post])
+        self.assertContains(response, 'Активные группы')
+
+    def test_hidden_group_is_skipped(self):
+        """Скрытая до удаления группа пропадает из топа."""
+        group = TrendingTest.group
+        record(TrendingBucket.GROUP, group.pk, 1)
+        compact()
+        self.assertEqual(trending_groups(), [group])
+        group.hidden = True
+        group.save(update_fields=['hidden'])
+        self.assertEqual(trending_groups(), [])
@@ -275,6 +275,16 @@ class TestCache(TestCase):
         )
         self.assertNotEqual(context_before, response.context)
 
+    def test_post_detail_author_count_is_fresh(self):
+        """Число постов автора на закэшированной странице поста свежее."""
+        post = Post.objects.create(author=TestCache.user, text='Текст')
+        url = reverse('posts:post_detail', args=[post.pk])
+        response = self.auth_user.get(url)
+        self.assertContains(response, 'Всего постов автора: 1')
+        self.auth_user.post(reverse('posts:post_create'), {'text': 'Ещё'})
+        response = self.auth_user.get(url)
+        self.assertContains(response, 'Всего постов автора: 2')
+
 
 class TestFollow(TestCase):
     @classmethod
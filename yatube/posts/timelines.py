@@ -0,0 +1,119 @@
+"""
+Лента подписок, собранная из кэшированных лент авторов.
+
+Для каждого автора в кэше лежат число его постов и список
+(timestamp, post_id) последних TIMELINE_LENGTH постов. Недостающие
+ленты читаются одним запросом с оконными функциями. Страница ленты
+подписок получается слиянием списков через heapq.merge, после чего
+посты страницы читаются из базы по id одним запросом; число постов
+для Paginator складывается из кэша без COUNT.
+"""
+import heapq
+import itertools
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Post
+
+
+def timeline_key(author_id):
+    return f'timeline:{author_id}'
+
+
+def invalidate_timeline(author_id):
+    cache.delete(timeline_key(author_id))
+
+
+def load_timelines(author_ids):
+    """{author_id: (число постов, лента)} одним запросом к базе."""
+    by_author = Window(
+        RowNumber(), partition_by=[F('author_id')],
+        order_by=[F('pub_date').desc(), F('id').desc()],
+    )
+    ranked = Post.objects.filter(author_id__in=author_ids).annotate(
+        position=by_author,
+        total=Window(Count('pk'), partition_by=[F('author_id')]),
+    ).order_by().values_list('id', 'author_id', 'pub_date', 'position',
+                             'total')
+    sql, params = ranked.query.sql_with_params()
+    # Фильтр по оконной функции в Django 2.2 возможен только снаружи.
+    rows = Post.objects.raw(
+        f'SELECT * FROM ({sql}) WHERE position <= %s '
+        'ORDER BY author_id, position',
+        (*params, settings.TIMELINE_LENGTH),
+    )
+    totals = dict.fromkeys(author_ids, 0)
+    timelines = {author_id: [] for author_id in author_ids}
+    for row in rows:
+        totals[row.author_id] = row.total
+        timelines[row.author_id].append((row.pub_date.timestamp(), row.id))
+    return {
+        author_id: (totals[author_id], timelines[author_id])
+        for author_id in author_ids
+    }
+
+
+def get_timelines(author_ids):
+    """(число постов, лента) авторов; недостающие дочитываются из базы."""
+    keys = {timeline_key(author_id): author_id for author_id in author_ids}
+    found = cache.get_many(keys)
+    missing = [
+        author_id for key, author_id in keys.items() if key not in found
+    ]
+    if missing:
+        loaded = {
+            timeline_key(author_id): timeline
+            for author_id, timeline in load_timelines(missing).items()
+        }
+        cache.set_many(loaded, settings.TIMELINE_TIMEOUT)
+        found.update(loaded)
+    return list(found.values())
+
+
+class MergedFollowFeed:
+    """
+    Посты авторов author_ids по убыванию даты.
+
+    Первые TIMELINE_LENGTH постов собираются k-way слиянием лент
+    авторов: ни один автор не может дать в первые k постов больше k
+    записей, поэтому обрезанных лент для этого достаточно. Более
+    глубокие страницы читаются обычным SQL-запросом.
+    """
+
+    def __init__(self, author_ids):
+        self.author_ids = list(author_ids)
+        self._timelines = None
+
+    @property
+    def timelines(self):
+        if self._timelines is None:
+            self._timelines = get_timelines(self.author_ids)
+        return self._timelines
+
+    def queryset(self):
+        # Тот же порядок, что у слияния по (timestamp, id), иначе посты
+        # с одинаковой датой на границе TIMELINE_LENGTH повторятся.
+        return Post.objects.filter(
+            author_id__in=self.author_ids
+        ).select_related('author', 'group').order_by('-pub_date', '-id')
+
+    def count(self):
+        return sum(total for total, _ in self.timelines)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if stop is None or stop > settings.TIMELINE_LENGTH:
+            return list(self.queryset()[start:stop])
+        merged = heapq.merge(
+            *(timeline for _, timeline in self.timelines), reverse=True
+        )
+        ids = [post_id for _, post_id in itertools.islice(
+            merged, start, stop
+        )]
+        posts = self.queryset().in_bulk(ids)
+        return [posts[post_id] for post_id in ids if post_id in posts]
@@ -0,0 +1,114 @@
+"""
+Популярные посты и группы.
+
+Каждый новый пост и комментарий добавляет вес в строку
+TrendingBucket своего интервала времени (TRENDING_BUCKET_SECONDS):
+одна строка на пост или группу за интервал. Команда compact_trending
+удаляет интервалы старше окна, складывает оставшиеся с затуханием
+(вес уменьшается вдвое за TRENDING_HALF_LIFE) и записывает топ в
+TrendingEntry. Страница читает только готовый топ.
+"""
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Group, Post, TrendingBucket, TrendingEntry
+
+POST_WEIGHT = 2.0
+COMMENT_WEIGHT = 1.0
+
+
+def bucket_for(moment):
+    return int(moment.timestamp()) // settings.TRENDING_BUCKET_SECONDS
+
+
+def record(kind, object_id, weight, now=None):
+    """Добавляет weight к текущему интервалу объекта."""
+    add(kind, object_id, bucket_for(now or timezone.now()), weight)
+
+
+def add(kind, object_id, bucket, weight):
+    rows = TrendingBucket.objects.filter(
+        kind=kind, object_id=object_id, bucket=bucket
+    )
+    if rows.update(hits=F('hits') + weight):
+        return
+    try:
+        with transaction.atomic(using=router.db_for_write(TrendingBucket)):
+            TrendingBucket.objects.create(
+                kind=kind, object_id=object_id, bucket=bucket, hits=weight
+            )
+    except IntegrityError:
+        # Строку интервала успел создать параллельный запрос.
+        rows.update(hits=F('hits') + weight)
+
+
+def record_post(post):
+    record(TrendingBucket.POST, post.pk, POST_WEIGHT)
+    if post.group_id:
+        record(TrendingBucket.GROUP, post.group_id, POST_WEIGHT)
+
+
+def record_comment(post):
+    # Тот же UPDATE, что и для постов: вес виден compact_trending сразу
+    # и не теряется при перезапуске процесса.
+    record(TrendingBucket.POST, post.pk, COMMENT_WEIGHT)
+    if post.group_id:
+        record(TrendingBucket.GROUP, post.group_id, COMMENT_WEIGHT)
+
+
+def compact(now=None):
+    """Пересобирает топ по интервалам окна; возвращает число строк."""
+    current = bucket_for(now or timezone.now())
+    TrendingBucket.objects.filter(
+        bucket__lte=current - settings.TRENDING_WINDOW_BUCKETS
+    ).delete()
+    decay = 0.5 ** (
+        settings.TRENDING_BUCKET_SECONDS / settings.TRENDING_HALF_LIFE
+    )
+    scores = defaultdict(float)
+    rows = TrendingBucket.objects.values_list(
+        'kind', 'object_id', 'bucket', 'hits'
+    )
+    for kind, object_id, bucket, hits in rows.iterator():
+        scores[kind, object_id] += hits * decay ** max(current - bucket, 0)
+    entries = []
+    for kind, _ in TrendingBucket.KINDS:
+        top = heapq.nlargest(settings.TRENDING_COUNT, (
+            (score, object_id)
+            for (key, object_id), score in scores.items() if key == kind
+        ))
+        entries.extend(
+            TrendingEntry(
+                kind=kind, rank=rank, object_id=object_id, score=score
+            )
+            for rank, (score, object_id) in enumerate(top, 1)
+        )
+    with transaction.atomic(using=router.db_for_write(TrendingEntry)):
+        TrendingEntry.objects.all().delete()
+        TrendingEntry.objects.bulk_create(entries)
+    return len(entries)
+
+
+def _top(kind, queryset):
+    ids = list(
+        TrendingEntry.objects.filter(kind=kind)
+        .values_list('object_id', flat=True)
+    )
+    found = queryset.in_bulk(ids)
+    # Удалённые после сборки топа объекты просто пропускаются.
+    return [found[object_id] for object_id in ids if object_id in found]
+
+
+def trending_posts():
+    return _top(
+        TrendingBucket.POST, Post.objects.select_related('author', 'group')
+    )
+
+
+def trending_groups():
+    return _top(TrendingBucket.GROUP, Group.objects.filter(hidden=False))
@@ -1,10 +1,35 @@
 from django.shortcuts import redirect, render, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_page
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.core.paginator import Paginator
+from django.db.models import F
 from django.conf import settings
+from core.events import publish_on_commit
+from core.holes import shared_page
+from core.jobs import enqueue
+from .export import FORMATS, iter_export, parse_date_filter
+from .feeds import ChainedFeed
+from .follows import follow_state, invalidate_followed
 from .forms import CommentForm, PostForm
-from .models import Group, Post, User, Follow
+from .jobs import warm_thumbnails
+from .models import (
+    ArchivedPost, FollowSuggestion, Group, Post, Tag, User, Follow,
+)
+from .profiles import AuthorPosts, get_profile
+from .tags import TagPosts, index_post
+from .timelines import MergedFollowFeed
+from .trending import (
+    record_comment, record_post, trending_groups, trending_posts,
+)
+
+
+def render_posts(request, template_name, context=None):
+    """render через шаблонизатор из POSTS_TEMPLATE_ENGINE."""
+    return render(
+        request, template_name, context,
+        using=settings.POSTS_TEMPLATE_ENGINE,
+    )
 
 
 def pagination(request, page_name):
@@ -14,51 +39,123 @@ def pagination(request, page_name):
     return page_obj
 
 
-@cache_page(20, key_prefix='index_page')
+def follow_suggestions(user, exclude=()):
+    """Рекомендованные авторы без тех, на кого user уже подписан."""
+    return list(
+        FollowSuggestion.objects.filter(user=user)
+        .exclude(author_id__in=exclude)
+        .select_related('author')[:settings.SUGGESTIONS_COUNT]
+    )
+
+
+def publish_post(post):
+    """Сообщает подписчикам лент о новом посте."""
+    data = {'id': post.pk, 'author': post.author.username}
+    channels = ['index', f'author:{post.author_id}']
+    if post.group:
+        channels.append(f'group:{post.group.slug}')
+    for channel in channels:
+        publish_on_commit(channel, 'post', data)
+
+
+@shared_page('posts')
 def index(request):
-    posts = Post.objects.order_by('-pub_date')
+    posts = ChainedFeed(
+        Post.objects.order_by('-pub_date'),
+        ArchivedPost.objects.all(),
+        cache_key='index',
+    )
     page_obj = pagination(request, posts)
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    return render_posts(request, 'posts/index.html', context)
 
 
+@shared_page('groups')
+def group_index(request):
+    groups = Group.objects.filter(hidden=False).order_by(
+        F('last_post_at').desc(nulls_last=True), 'title'
+    )
+    context = {
+        'page_obj': pagination(request, groups),
+    }
+    return render_posts(request, 'posts/group_index.html', context)
+
+
+@shared_page('trending', 'posts')
+def trending(request):
+    context = {
+        'posts': trending_posts(),
+        'groups': trending_groups(),
+    }
+    return render_posts(request, 'posts/trending.html', context)
+
+
+@shared_page('group:{slug}')
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_object_or_404(Group, slug=slug, hidden=False)
+    posts = ChainedFeed(
+        group.posts.all(),
+        group.archived_posts.all(),
+        cache_key=f'group:{group.pk}',
+    )
     page_obj = pagination(request, posts)
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_posts(request, 'posts/group_list.html', context)
+
+
+@shared_page('tag:{name}')
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    context = {
+        'tag': tag,
+        'page_obj': pagination(request, TagPosts(tag)),
+    }
+    return render_posts(request, 'posts/tag_list.html', context)
 
 
+@shared_page('author:{username}')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
+    author, head = get_profile(username)
+    post_list = ChainedFeed(
+        AuthorPosts(author, head),
+        # Группы архива могут жить в другой базе: prefetch, не JOIN.
+        author.archived_posts.prefetch_related('group'),
+        cache_key=f'author:{author.pk}',
+    )
     page_obj = pagination(request, post_list)
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=author
-    ).exists()
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_posts(request, 'posts/profile.html', context)
 
 
+@shared_page('post:{post_id}')
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    post = Post.objects.filter(id=post_id).first()
+    is_archived = post is None
+    if is_archived:
+        post = get_object_or_404(ArchivedPost, id=post_id)
+    # Комментарии могут жить в другой базе, поэтому без select_related
+    # и без фильтра по автору в SQL; удаляемых в фоне авторов не видно.
+    comments = [
+        comment for comment in post.comments.prefetch_related(
+            'author', 'author__deletion'
+        )
+        if not hasattr(comment.author, 'deletion')
+    ]
     context = {
         'post': post,
         'form': CommentForm(),
         'comments': comments,
+        'is_archived': is_archived,
     }
-    return render(request, 'posts/post_detail.html', context)
+    return render_posts(request, 'posts/post_detail.html', context)
 
 
 @login_required
@@ -66,12 +163,17 @@ def post_create(request):
     template = 'posts/create_posts.html'
     form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method != 'POST':
-        return render(request, template, {'form': form})
+        return render_posts(request, template, {'form': form})
     if not form.is_valid():
-        return render(request, template, {'form': form})
+        return render_posts(request, template, {'form': form})
     new_post = form.save(commit=False)
     new_post.author = request.user
     new_post.save()
+    index_post(new_post)
+    if new_post.image:
+        enqueue(warm_thumbnails, post_id=new_post.pk)
+    publish_post(new_post)
+    record_post(new_post)
     return redirect('posts:profile', username=request.user)
 
 
@@ -85,20 +187,24 @@ def post_edit(request, post_id):
         instance=post or None
     )
     if request.user != post.author:
-        return render(
+        return render_posts(
             request,
             template,
             {'form': form, 'post': post, 'is_edit': True}
         )
 
     if not form.is_valid():
-        return render(
+        return render_posts(
             request,
             template,
             {'form': form, 'post': post, 'is_edit': True}
         )
 
-    form.save()
+    post = form.save()
+    if 'text' in form.changed_data:
+        index_post(post)
+    if 'image' in form.changed_data and post.image:
+        enqueue(warm_thumbnails, post_id=post.pk)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -111,26 +217,42 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post
         comment.save()
+        record_comment(post)
+        publish_on_commit(f'post:{post.pk}', 'comment', {
+            'id': comment.pk,
+            'author': comment.author.username,
+            'text': comment.text,
+        })
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    authors = list(follow_state(request))
+    posts = ChainedFeed(
+        MergedFollowFeed(authors),
+        ArchivedPost.objects.filter(author_id__in=authors),
+    )
     page_obj = pagination(request, posts)
     context = {
         'page_obj': page_obj,
+        'suggestions': follow_suggestions(request.user, authors),
     }
-    return render(request, 'posts/follow.html', context)
+    return render_posts(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     user = request.user
-    author = User.objects.get(username=username)
-    is_follower = Follow.objects.filter(user=user, author=author)
-    if user != author and not is_follower.exists():
-        Follow.objects.create(user=user, author=author)
+    # На удаляемого в фоне автора (posts.deletion) подписаться нельзя.
+    author = get_object_or_404(
+        User, username=username, deletion__isnull=True
+    )
+    # follow_state кэшируется и может отстать от базы (отписка в другом
+    # воркере), поэтому запись не сверяется с ним.
+    if user != author:
+        Follow.objects.get_or_create(user=user, author=author)
+        invalidate_followed(user.pk)
     return redirect('posts:profile', username=author.username)
 
 
@@ -141,3 +263,30 @@ def profile_unfollow(request, username):
         user=request.user, author=author
     ).delete()
     return redirect('posts:profile', username=author.username)
+
+
+@staff_member_required
+def export(request):
+    export_format = request.GET.get('format', 'jsonl')
+    if export_format not in FORMATS:
+        return HttpResponseBadRequest(f'Неизвестный формат: {export_format}')
+    content_type = {
+        'csv': 'text/csv; charset=utf-8',
+    }.get(export_format, 'application/x-ndjson; charset=utf-8')
+    try:
+        since = parse_date_filter(request.GET.get('since'))
+        until = parse_date_filter(request.GET.get('until'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    lines = iter_export(
+        export_format,
+        since=since,
+        until=until,
+        group=request.GET.get('group'),
+        author=request.GET.get('author'),
+    )
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="yatube-export.{export_format}"'
+    )
+    return response
@@ -33,11 +33,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.HoleFillMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -50,7 +56,8 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'NAME': 'django',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -60,21 +67,126 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.events.events',
+            ],
+        },
+    },
+    {
+        'NAME': 'jinja2',
+        'BACKEND': 'core.template_backends.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'core.jinja2.environment',
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'core.context_processors.year.year',
+                'core.context_processors.events.events',
             ],
         },
     },
 ]
 
+# Шаблонизатор страниц posts: 'django' или 'jinja2'.
+POSTS_TEMPLATE_ENGINE = 'django'
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+                'cache_size': -64000,
+                'mmap_size': 268435456,
+                'temp_store': 'MEMORY',
+            },
+        },
+    },
+    'replica': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'busy_timeout': 20000,
+                'cache_size': -64000,
+                'mmap_size': 268435456,
+                'query_only': 1,
+            },
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+    'comments': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.comments.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+            },
+        },
+    },
+    'archive': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.archive.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'busy_timeout': 20000,
+                'mmap_size': 268435456,
+            },
+        },
+    },
+    'follows': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.follows.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+            },
+        },
+    },
 }
 
+# Псевдонимы баз-реплик для чтения; пустой список — всё идёт в default.
+# Реплики SQLite обновляются командой sync_replicas.
+DATABASE_REPLICAS = []
+# Модели, вынесенные в отдельные базы: 'app.model' -> псевдоним базы.
+# Например {'posts.comment': 'comments', 'posts.follow': 'follows'}.
+# Архив переносится целиком: 'posts.archivedpost' и 'posts.archivedcomment'
+# -> 'archive';
+# после изменения нужно выполнить migrate --database для этих баз.
+DATABASE_PARTITIONS = {}
+DATABASE_ROUTERS = [
+    'core.routers.PartitionRouter',
+    'core.routers.ReplicaRouter',
+]
+REPLICA_STICKINESS_SECONDS = 10
+# Приложения, которые никогда не читаются с реплик: свежая сессия или
+# смена пароля должны быть видны сразу.
+REPLICA_EXCLUDED_APPS = ('sessions', 'auth', 'contenttypes')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -104,15 +216,94 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Сборка статики: collectstatic кладёт в STATIC_ROOT файлы с хешем
+# в имени и их сжатые варианты, StaticFilesMiddleware отдаёт их
+# с вечным кэшем, а {% static %} подставляет имена с хешем.
+STATIC_PIPELINE = False
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+if STATIC_PIPELINE:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Сжатие и минификация ответов (core.middleware.CompressionMiddleware).
+HTML_MINIFY = True
+COMPRESSION_MIN_LENGTH = 200
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript',
+    'application/xml', 'application/x-ndjson',
+)
+# Уровни для ответов, которые сжимаются на каждом запросе.
+COMPRESSION_LEVELS = {'gzip': 5, 'br': 4}
+
+# Общий кэш страниц с персональными фрагментами (core.holes).
+SHARED_PAGE_TIMEOUT = 5 * 60
+# Параметры запроса, от которых зависят общие страницы.
+SHARED_PAGE_PARAMS = ('page',)
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма копятся в базе, отправляет их команда send_outbox.
+EMAIL_BACKEND = 'core.mail.OutboxBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_POLL_INTERVAL = 5
+OUTBOX_RATE_PER_SECOND = 10
+OUTBOX_MAX_ATTEMPTS = 5
+# Задержка первого повтора в секундах, дальше она удваивается.
+OUTBOX_RETRY_DELAY = 60
+# На сколько секунд send_outbox забирает письмо себе; должно быть
+# больше времени отправки порции.
+OUTBOX_LOCK_TIMEOUT = 10 * 60
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PAGINATOR_COUNT = 10
 
+SUGGESTIONS_COUNT = 5
+
+# Сколько последних постов автора держать в кэше для ленты подписок.
+TIMELINE_LENGTH = 100
+# Ленты сбрасываются сигналами только в процессе, где был пост; с кэшем
+# процесса другие воркеры показывают новый пост с этой задержкой.
+TIMELINE_TIMEOUT = 30
+
+# Кэш подписок сбрасывается сигналами только в своём процессе, поэтому
+# с кэшем процесса другие воркеры отстают на это время.
+FOLLOWED_IDS_TIMEOUT = 30
+
+# Популярное (posts.trending): интервалы, окно и затухание весов.
+TRENDING_BUCKET_SECONDS = 60 * 60
+TRENDING_WINDOW_BUCKETS = 48
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_COUNT = 10
+
+# Автор, число постов и первая страница профиля (posts.profiles).
+PROFILE_TIMEOUT = 10 * 60
+
+# Поток server-sent events: SSE_URL?channel=index&channel=post:1.
+# Его обслуживает команда serve_events на SSE_HOST:SSE_PORT (прокси
+# направляет туда SSE_URL), события от воркеров приходят в Unix-сокет
+# SSE_SOCKET. Пустой SSE_URL выключает живые обновления на страницах.
+SSE_URL = '/events/'
+SSE_HOST = '127.0.0.1'
+SSE_PORT = 8001
+SSE_SOCKET = os.path.join(BASE_DIR, 'events.sock')
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_SECONDS = 5 * 60
+SSE_RETRY_MS = 3000
+SSE_QUEUE_SIZE = 100
+SSE_MAX_CHANNELS = 10
+
+# Очередь фоновых задач (core.jobs), воркер — команда run_jobs.
+JOB_BATCH_SIZE = 50
+JOB_POLL_INTERVAL = 1
+# Задержка первого повтора в секундах, дальше она удваивается.
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 10 * 60
+# Сколько строк удаляет один шаг фонового удаления (posts.deletion).
+DELETION_BATCH_SIZE = 500
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
@@ -120,6 +311,53 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
     }
 }
+
+# Хранилище сессий: 'db', 'cached_db' (кэш, база при промахе)
+# или 'signed_cookies' (данные в подписанной cookie, без базы).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'core.sessions',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_STORE = 'cached_db'
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STORE]
+
+# Сколько держать в кэше пользователя запроса (core.auth). Кэш
+# используется, только если CACHES['default'] общий для воркеров.
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
+
+METRICS_ALLOWED_IPS = INTERNAL_IPS
+
+SLOW_QUERY_LOG = True
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.1
+SLOW_QUERY_LOG_SIZE = 200
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'slow_queries.log'),
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Посты старше этого срока archive_posts переносит в архивные таблицы.
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_COUNT_TIMEOUT = 60 * 60
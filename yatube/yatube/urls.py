@@ -3,12 +3,20 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
 
+from core.views import metrics_view, slow_queries_view
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path(
+        'admin/slow-queries/',
+        slow_queries_view,
+        name='slow_queries'
+    ),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 handler404 = 'core.views.page_not_found'